@@ -1,7 +1,11 @@
 #!/usr/bin/env python3
 import argparse
+import json
 from pathlib import Path
 
+# postings returned by --index query when --top_k is not given
+DEFAULT_INDEX_TOP_K = 10
+
 # Adjust this import to match wherever you put your KeywordsAnalyzerTool class.
 # For example, if you saved the code above into a file named "keywords_analyzer_tool.py",
 # then this line should be:
@@ -11,7 +15,52 @@ from pathlib import Path
 # If it’s in the same file, you can simply do:
 #     from <filename> import KeywordsAnalyzerTool
 #
-from tools.keywords_analyzer_tool import KeywordsAnalyzerTool
+# The tools import crewai, spacy and sklearn, which take seconds: they are imported in main()
+# once the arguments are parsed, so `--help` and usage errors return immediately.
+
+
+def read_text(path: Path, label: str):
+    # Read the normalized text of a markdown, text, PDF or DOCX file
+    try:
+        from tools.ingest import document_text
+        return document_text(path)
+    except Exception as e:
+        print(f"Error reading {label} file '{path}': {e}")
+        return None
+
+
+def print_batch(results, output_format: str):
+    if output_format in ("json", "jsonl"):
+        for result in results:
+            print(json.dumps(result))
+        return
+
+    from tabulate import tabulate
+    table = [
+        [r["resume"], r["job_description"], r["keywords_match"], r["cosine_similarity"],
+         f'{r["matched_keywords"]}/{r["jd_keywords"]}', r["phrases_match"]]
+        for r in results
+    ]
+    print(tabulate(table, headers=["Rank", "Resume", "Job Description", "Keywords Match %",
+                                   "Cosine Similarity %", "Matched Keywords", "Key Phrases Match %"],
+                   showindex=range(1, len(table) + 1), tablefmt="psql"))
+
+
+def print_index_results(results, output_format: str):
+    if output_format in ("json", "jsonl"):
+        for result in results:
+            print(json.dumps(result))
+        return
+
+    from tabulate import tabulate
+    table = [
+        [r["job_description"], r["cosine_similarity"], r["keywords_match"],
+         ", ".join(r["missing_keywords"][:10])]
+        for r in results
+    ]
+    print(tabulate(table, headers=["Rank", "Job Description", "Cosine Similarity %", "Keywords Match %",
+                                   "Missing Keywords (first 10)"],
+                   showindex=range(1, len(table) + 1), tablefmt="psql"))
 
 
 def main():
@@ -19,37 +68,162 @@ def main():
     parser.add_argument(
         "--resume",
         type=Path,
-        required=True,
         help="Path to the resume file (plain text)."
     )
     parser.add_argument(
         "--job_desc",
         type=Path,
-        required=True,
         help="Path to the job description file (plain text)."
     )
+    parser.add_argument(
+        "--batch",
+        type=Path,
+        help="Directory of .md, .txt, .pdf or .docx files. With --resume, ranks every job description in it; "
+             "with --job_desc, ranks every resume in it."
+    )
+    parser.add_argument(
+        "--format",
+        choices=["table", "json", "jsonl"],
+        default="table",
+        help="Output format (default: table). For one resume and job description, `json` returns only "
+             "the scores and the missing keywords; batch and index results use `jsonl` (or `json`)."
+    )
+    parser.add_argument(
+        "--n_process",
+        type=int,
+        default=1,
+        help="Number of processes used by spaCy in batch mode (default: 1)."
+    )
+    parser.add_argument(
+        "--index",
+        choices=["build", "query"],
+        help="Job postings index: `build` indexes the --batch directory into --index_dir, "
+             "`query` returns the --top_k postings of --index_dir matching --resume."
+    )
+    parser.add_argument(
+        "--index_dir",
+        type=Path,
+        default=Path("index"),
+        help="Directory of the job postings index (default: index/)."
+    )
+    parser.add_argument(
+        "--top_k",
+        type=int,
+        help="Number of postings returned by --index query (default: 10); with --format json, "
+             "number of missing key phrases and keywords returned, by weight in the job description (default: all)."
+    )
+    parser.add_argument(
+        "--serve",
+        action="store_true",
+        help="Run the resident analyzer service: the pipeline stays loaded and scoring requests are "
+             "served over HTTP on --service."
+    )
+    parser.add_argument(
+        "--service",
+        help="host:port of the analyzer service (default: ANALYZER_SERVICE or 127.0.0.1:8765). "
+             "A single resume/job description pair is scored by the service when it is running."
+    )
+    parser.add_argument(
+        "--pool_size",
+        type=int,
+        default=4,
+        help="With --serve, number of requests scored concurrently (default: 4)."
+    )
+    parser.add_argument(
+        "--no_service",
+        action="store_true",
+        help="Always score in this process, even when the analyzer service is running."
+    )
     args = parser.parse_args()
+    if args.top_k is not None and args.top_k < 1:
+        parser.error("--top_k must be at least 1")
 
-    # Read the contents of each file as UTF-8 text
-    try:
-        resume_text = args.resume.read_text(encoding="utf-8")
-    except Exception as e:
-        print(f"Error reading resume file '{args.resume}': {e}")
+    if args.serve:
+        if args.pool_size < 1:
+            parser.error("--pool_size must be at least 1")
+        import logging
+        from tools.analyzer_service import serve
+        logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s: %(message)s")
+        serve(args.service, pool_size=args.pool_size)
         return
 
-    try:
-        jd_text = args.job_desc.read_text(encoding="utf-8")
-    except Exception as e:
-        print(f"Error reading job description file '{args.job_desc}': {e}")
+    if args.index == "build":
+        from tools.job_index import build_index
+        if not args.batch or not args.batch.is_dir():
+            parser.error("--index build needs --batch <directory of job descriptions>")
+        count = build_index(args.batch, args.index_dir, n_process=args.n_process)
+        print(f"Indexed {count} job postings into `{args.index_dir}`.")
+        return
+
+    if args.index == "query":
+        from tools.job_index import JobIndex
+        if args.resume is None:
+            parser.error("--index query needs --resume")
+        resume_text = read_text(args.resume, "resume")
+        if resume_text is None:
+            return
+        try:
+            index = JobIndex(args.index_dir)
+        except (OSError, RuntimeError) as e:
+            print(f"Error opening index '{args.index_dir}': {e}")
+            return
+        # --top_k is left unset for --format json to mean all missing keywords, so its index default is set here
+        top_k = args.top_k if args.top_k is not None else DEFAULT_INDEX_TOP_K
+        results = index.query(resume_text, top_k=top_k)
+        print_index_results(results, args.format)
         return
 
+    if args.batch:
+        if (args.resume is None) == (args.job_desc is None):
+            parser.error("--batch needs exactly one of --resume or --job_desc")
+        if not args.batch.is_dir():
+            parser.error(f"--batch `{args.batch}` is not a directory")
+
+        from tools.batch_scoring import read_documents, score_batch
+
+        documents = read_documents(args.batch)
+        if args.resume:
+            resume_text = read_text(args.resume, "resume")
+            if resume_text is None:
+                return
+            results = score_batch({args.resume.name: resume_text}, documents, n_process=args.n_process)
+        else:
+            jd_text = read_text(args.job_desc, "job description")
+            if jd_text is None:
+                return
+            results = score_batch(documents, {args.job_desc.name: jd_text}, n_process=args.n_process)
+
+        print_batch(results, args.format)
+        return
+
+    if args.resume is None or args.job_desc is None:
+        parser.error("--resume and --job_desc are required unless --batch is used")
+
+    resume_text = read_text(args.resume, "resume")
+    if resume_text is None:
+        return
+    jd_text = read_text(args.job_desc, "job description")
+    if jd_text is None:
+        return
+
+    output_format = "table" if args.format == "table" else "json"
+
+    # Score with the warm analyzer service when it is running
+    if not args.no_service:
+        from tools.analyzer_service import analyze_remote
+        result = analyze_remote(resume_text, jd_text, output_format=output_format, top_k=args.top_k,
+                                address=args.service)
+        if result is not None:
+            print(result)
+            return
+
     # Instantiate the tool and run it
+    from tools.keywords_analyzer_tool import KeywordsAnalyzerTool
     tool = KeywordsAnalyzerTool()
-    result = tool._run(resume=resume_text, job_description=jd_text)
+    result = tool._run(resume=resume_text, job_description=jd_text, output_format=output_format, top_k=args.top_k)
 
     # Print the output
     print(result)
 
-
 if __name__ == "__main__":
     main()
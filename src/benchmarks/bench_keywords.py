@@ -0,0 +1,225 @@
+#!/usr/bin/env python3
+"""
+Benchmark of the KeywordsAnalyzerTool pipeline on synthetic resumes and job descriptions.
+
+For every document size and stage it reports the median latency, the throughput and the peak
+Python memory (tracemalloc), as JSON. With --baseline it compares the medians with a stored run
+and exits with status 1 when a stage got slower than the allowed tolerance, or fails while it
+ran in the baseline.
+
+    python src/benchmarks/bench_keywords.py --save_baseline bench_baseline.json
+    python src/benchmarks/bench_keywords.py --baseline bench_baseline.json --tolerance 0.25
+
+Results depend on the machine: store the baseline on the machine that runs the check.
+The persistent analysis cache is bypassed, every stage is measured cold.
+"""
+import sys
+import json
+import time
+import random
+import argparse
+import platform
+import statistics
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from tools import keywords_analyzer_tool as kat  # noqa: E402
+
+DEFAULT_SIZES = [1_000, 10_000, 100_000, 1_000_000]
+STAGES = ["spacy_keywords", "spacy_chunked", "nltk_keywords", "unique_tokens", "matching", "cosine"]
+
+_COMMON_WORDS = (
+    "the and with for our you will team work experience build design develop deliver support "
+    "systems services data product customers engineering quality strong skills ability years "
+    "across platform solutions high scale performance drive own lead collaborate improve"
+).split()
+_SKILLS = (
+    "Python Java Kubernetes Docker Terraform React TypeScript PostgreSQL Kafka Spark Airflow "
+    "TensorFlow PyTorch AWS Azure GCP Linux Redis GraphQL Jenkins Ansible Snowflake Databricks"
+).split()
+
+
+def synthetic_document(size, seed, vocabulary_size):
+    '''
+    This function generates a deterministic resume-like text of about `size` bytes.
+    Input: Size in bytes, random seed, number of distinct proper nouns
+    Output: Text string
+    '''
+    rng = random.Random(seed)
+    # the number of distinct proper nouns grows with the document, as in real resumes
+    proper_nouns = _SKILLS + [f"Tool{n}" for n in range(vocabulary_size)]
+    paragraphs, length = [], 0
+    while length < size:
+        sentences = []
+        for _ in range(rng.randint(2, 5)):
+            words = [rng.choice(_COMMON_WORDS) if rng.random() < 0.7 else rng.choice(proper_nouns)
+                     for _ in range(rng.randint(8, 20))]
+            sentences.append(" ".join(words).capitalize() + ".")
+        paragraph = " ".join(sentences)
+        paragraphs.append(paragraph)
+        length += len(paragraph) + 2
+    return "\n\n".join(paragraphs)[:size]
+
+
+def make_inputs(size):
+    vocabulary_size = max(50, size // 200)
+    resume = synthetic_document(size, seed=size, vocabulary_size=vocabulary_size)
+    job_description = synthetic_document(size, seed=size + 1, vocabulary_size=vocabulary_size)
+    tokens = kat.clean_text(resume).split()
+    keywords_jd = list(dict.fromkeys(t.lower() for t in kat.clean_text(job_description).split()))
+    return {
+        "resume": resume,
+        "job_description": job_description,
+        "tokens": tokens,
+        "keywords_jd": keywords_jd,
+        "jd_hashes": kat.keyword_hashes(keywords_jd),
+        "resume_hashes": kat.keyword_hashes(list({t.lower() for t in tokens})),
+    }
+
+
+def stage_function(stage, inputs, size):
+    if stage == "spacy_keywords":
+        return lambda: kat._spacy_keywords(inputs["resume"])
+    if stage == "spacy_chunked":
+        # 16 chunks whatever the size, tagged by ANALYSIS_PROCESSES processes (default: one per CPU)
+        return lambda: kat.spacy_chunked_keywords(inputs["resume"], max_chars=max(1_000, size // 16))
+    if stage == "nltk_keywords":
+        return lambda: kat._nltk_keywords(inputs["resume"])
+    if stage == "unique_tokens":
+        return lambda: kat.unique_tokens(inputs["tokens"])
+    if stage == "matching":
+        return lambda: kat.match_keyword_hashes(inputs["keywords_jd"], inputs["jd_hashes"], inputs["resume_hashes"])
+    if stage == "cosine":
+        return lambda: kat.cosine_from_counts(kat._count_vector(inputs["job_description"]),
+                                              kat._count_vector(inputs["resume"]))
+    raise ValueError(f"Unknown stage `{stage}`")
+
+
+def measure(fn, size, min_repeats, time_budget):
+    '''
+    This function times fn until it ran min_repeats times and time_budget seconds elapsed,
+    then runs it once more under tracemalloc for the peak memory.
+    Input: Function, input size in bytes, minimum repeats, time budget in seconds
+    Output: Measurement dict
+    '''
+    fn()  # warm up: model loading and lazy resources are not part of the measurement
+    timings = []
+    started = time.perf_counter()
+    while len(timings) < min_repeats or time.perf_counter() - started < time_budget:
+        t0 = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - t0)
+        if time.perf_counter() - started > 10 * time_budget:
+            break
+
+    tracemalloc.start()
+    try:
+        fn()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    median = statistics.median(timings)
+    return {
+        "repeats": len(timings),
+        "median_s": median,
+        "min_s": min(timings),
+        "throughput_bytes_per_s": size / median if median else None,
+        "peak_memory_bytes": peak,
+    }
+
+
+def run(sizes, stages, min_repeats, time_budget):
+    results = []
+    for size in sizes:
+        inputs = make_inputs(size)
+        for stage in stages:
+            entry = {"stage": stage, "size": size}
+            try:
+                entry.update(measure(stage_function(stage, inputs, size), size, min_repeats, time_budget))
+            except Exception as e:
+                # e.g. NLTK data or the spaCy model not installed, or spaCy max_length exceeded
+                entry["error"] = f"{type(e).__name__}: {e}"
+            results.append(entry)
+            print(f"{stage:>15} {size:>9} B  "
+                  + (f"{entry['median_s'] * 1000:10.2f} ms" if "median_s" in entry else entry["error"][:80]),
+                  file=sys.stderr)
+    return {
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "spacy_pipeline": kat.spacy_pipeline_version(),
+        "results": results,
+    }
+
+
+def compare(report, baseline, tolerance):
+    '''
+    This function lists the stages slower than the baseline by more than the tolerance, and the
+    stages of the baseline that fail in the current run.
+    Input: Current report, baseline report, tolerance (0.25 = 25% slower allowed)
+    Output: List of regression descriptions
+    '''
+    reference = {(r["stage"], r["size"]): r for r in baseline["results"] if "median_s" in r}
+    regressions = []
+    for r in report["results"]:
+        base = reference.get((r["stage"], r["size"]))
+        if base is None:
+            continue
+        if "median_s" not in r:
+            # a stage that breaks is a regression, not a missing measurement
+            regressions.append(f"{r['stage']} @ {r['size']} B: failed ({r.get('error', 'no timing')}), "
+                               f"baseline {base['median_s'] * 1000:.2f} ms")
+            continue
+        if r["median_s"] > base["median_s"] * (1 + tolerance):
+            regressions.append(
+                f"{r['stage']} @ {r['size']} B: {r['median_s'] * 1000:.2f} ms "
+                f"vs baseline {base['median_s'] * 1000:.2f} ms (+{(r['median_s'] / base['median_s'] - 1) * 100:.0f}%)"
+            )
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the KeywordsAnalyzerTool pipeline.")
+    parser.add_argument("--sizes", default=",".join(map(str, DEFAULT_SIZES)),
+                        help="Comma separated document sizes in bytes (default: 1 KB to 1 MB).")
+    parser.add_argument("--stages", default=",".join(STAGES),
+                        help=f"Comma separated stages (default: {','.join(STAGES)}).")
+    parser.add_argument("--min_repeats", type=int, default=3,
+                        help="Minimum timed runs per stage and size (default: 3).")
+    parser.add_argument("--time_budget", type=float, default=1.0,
+                        help="Seconds spent timing each stage and size at least (default: 1.0).")
+    parser.add_argument("--output", type=Path, help="Write the JSON report to this file instead of stdout.")
+    parser.add_argument("--save_baseline", type=Path, help="Also store the report as baseline in this file.")
+    parser.add_argument("--baseline", type=Path, help="Baseline report to check for regressions.")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="Allowed slowdown over the baseline median (default: 0.25 = 25%%).")
+    args = parser.parse_args()
+
+    sizes = [int(s) for s in args.sizes.split(",") if s.strip()]
+    stages = [s.strip() for s in args.stages.split(",") if s.strip()]
+    unknown = set(stages) - set(STAGES)
+    if unknown:
+        parser.error(f"unknown stages: {', '.join(sorted(unknown))}")
+
+    report = run(sizes, stages, args.min_repeats, args.time_budget)
+
+    text = json.dumps(report, indent=2)
+    if args.output:
+        args.output.write_text(text)
+    else:
+        print(text)
+    if args.save_baseline:
+        args.save_baseline.write_text(text)
+
+    if args.baseline:
+        regressions = compare(report, json.loads(args.baseline.read_text()), args.tolerance)
+        if regressions:
+            print("Performance regressions:\n  " + "\n  ".join(regressions), file=sys.stderr)
+            sys.exit(1)
+        print("No performance regression.", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
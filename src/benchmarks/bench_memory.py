@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+"""
+Memory benchmark of concurrent KeywordsAnalyzerTool analyses.
+
+For every concurrency level it creates one analyzer per worker thread, as the analyzer service
+pool does, and scores a different synthetic resume against the same job description on each of
+them at the same time. It reports, per concurrent analysis, the peak Python memory while the
+analyses run (tracemalloc), the memory the analyzers still hold afterwards (their paragraph and
+job description caches), and the growth of the process resident set size, as JSON.
+
+    python src/benchmarks/bench_memory.py
+    python src/benchmarks/bench_memory.py --concurrency 1,8,32 --size 50000 --output memory.json
+
+The persistent analysis cache is bypassed, every analysis tags its documents.
+"""
+import os
+import sys
+import gc
+import json
+import time
+import argparse
+import platform
+import threading
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.pop("ANALYSIS_CACHE_PATH", None)
+
+from benchmarks.bench_keywords import synthetic_document  # noqa: E402
+from tools import keywords_analyzer_tool as kat  # noqa: E402
+
+DEFAULT_CONCURRENCY = [1, 4, 16]
+DEFAULT_SIZE = 20_000
+
+
+def resident_bytes():
+    '''
+    This function reads the resident set size of the process (Linux only).
+    Output: Bytes, or None when /proc is not available
+    '''
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        return None
+
+
+class ResidentPeak(threading.Thread):
+    """
+    Samples the resident set size every few milliseconds and keeps the highest value.
+    """
+
+    def __init__(self, interval=0.005):
+        super().__init__(daemon=True)
+        self.interval = interval
+        self.peak = resident_bytes()
+        self._stop_event = threading.Event()
+
+    def run(self):
+        while not self._stop_event.is_set():
+            rss = resident_bytes()
+            if rss is not None and (self.peak is None or rss > self.peak):
+                self.peak = rss
+            time.sleep(self.interval)
+
+    def stop(self):
+        self._stop_event.set()
+        self.join()
+        return self.peak
+
+
+def keyword_footprint(text):
+    '''
+    This function compares the size of the keywords of a text held as Python strings and as hashes.
+    Input: Text data
+    Output: Dict with the number of keywords and both sizes in bytes
+    '''
+    keywords = kat._spacy_keywords(text)
+    hashes = kat.keyword_hashes(keywords)
+    return {
+        "keywords": len(keywords),
+        "strings_bytes": sys.getsizeof(keywords) + sum(sys.getsizeof(k) for k in keywords),
+        "hashes_bytes": int(hashes.nbytes),
+    }
+
+
+def measure(concurrency, job_description, resumes):
+    '''
+    This function runs `concurrency` analyses at the same time, each on its own analyzer.
+    Input: Number of concurrent analyses, job description, one resume per analysis
+    Output: Measurement dict, memory per analysis
+    '''
+    gc.collect()
+    rss_before = resident_bytes()
+    tracemalloc.start()
+    sampler = ResidentPeak()
+    sampler.start()
+    try:
+        tools = [kat.KeywordsAnalyzerTool() for _ in range(concurrency)]
+        start = threading.Barrier(concurrency)
+        errors = []
+
+        def analyze(tool, resume):
+            start.wait()
+            try:
+                tool.analyze(resume, job_description)
+            except Exception as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=analyze, args=(tool, resume)) for tool, resume in zip(tools, resumes)]
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - started
+        if errors:
+            raise errors[0]
+
+        gc.collect()
+        retained, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+        rss_peak = sampler.stop()
+
+    entry = {
+        "concurrency": concurrency,
+        "wall_s": elapsed,
+        "peak_memory_bytes_per_analysis": peak // concurrency,
+        "retained_memory_bytes_per_analysis": retained // concurrency,
+    }
+    if rss_before is not None and rss_peak is not None:
+        entry["rss_growth_bytes_per_analysis"] = max(rss_peak - rss_before, 0) // concurrency
+    del tools
+    return entry
+
+
+def run(levels, size):
+    job_description = synthetic_document(size, seed=1, vocabulary_size=max(50, size // 200))
+    # warm up: model loading and lazy resources are not part of the measurement
+    kat.KeywordsAnalyzerTool().analyze(synthetic_document(size, seed=2, vocabulary_size=50), job_description)
+
+    results = []
+    for concurrency in levels:
+        resumes = [synthetic_document(size, seed=100 + n, vocabulary_size=max(50, size // 200))
+                   for n in range(concurrency)]
+        entry = measure(concurrency, job_description, resumes)
+        results.append(entry)
+        print(f"{concurrency:>4} concurrent  {entry['peak_memory_bytes_per_analysis'] / 1e6:8.2f} MB peak  "
+              f"{entry['retained_memory_bytes_per_analysis'] / 1e6:8.2f} MB retained per analysis",
+              file=sys.stderr)
+    return {
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "spacy_pipeline": kat.spacy_pipeline_version(),
+        "size": size,
+        "keyword_footprint": keyword_footprint(job_description),
+        "results": results,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the memory of concurrent keyword analyses.")
+    parser.add_argument("--concurrency", default=",".join(map(str, DEFAULT_CONCURRENCY)),
+                        help="Comma separated numbers of concurrent analyses (default: 1,4,16).")
+    parser.add_argument("--size", type=int, default=DEFAULT_SIZE,
+                        help="Size in bytes of each resume and of the job description (default: 20000).")
+    parser.add_argument("--output", type=Path, help="Write the JSON report to this file instead of stdout.")
+    args = parser.parse_args()
+
+    levels = [int(c) for c in args.concurrency.split(",") if c.strip()]
+    if not levels or min(levels) < 1:
+        parser.error("--concurrency needs positive integers")
+
+    text = json.dumps(run(levels, args.size), indent=2)
+    if args.output:
+        args.output.write_text(text)
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
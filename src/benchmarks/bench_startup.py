@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Startup benchmark of the command line entry points.
+
+Runs `<script> --help` of every entry point in a fresh interpreter and checks that the median wall
+time stays under a fixed budget: crewai, crewai_tools, spaCy, NLTK, sklearn and langtrace must only
+be imported once a command actually needs them. When a script is over budget, its slowest imports
+(python -X importtime) are listed so the offending module level import is easy to find.
+
+    python src/benchmarks/bench_startup.py
+    python src/benchmarks/bench_startup.py --budget 0.5 --output startup.json
+"""
+import sys
+import json
+import argparse
+import platform
+import statistics
+import subprocess
+import time
+from pathlib import Path
+
+SRC_DIR = Path(__file__).resolve().parent.parent
+ENTRY_POINTS = ["gen_application.py", "gen_motivation.py", "gen_all.py", "gen_batch.py", "analyze.py"]
+
+
+def run_help(script):
+    started = time.perf_counter()
+    result = subprocess.run([sys.executable, script, "--help"], cwd=SRC_DIR, capture_output=True, text=True)
+    elapsed = time.perf_counter() - started
+    if result.returncode != 0:
+        raise RuntimeError(f"`{script} --help` exited with {result.returncode}: {result.stderr.strip()[-500:]}")
+    return elapsed
+
+
+def slowest_imports(script, count=10):
+    '''
+    This function lists the imports of `script --help` with the highest cumulative time.
+    Input: Script name, number of imports to list
+    Output: List of (cumulative milliseconds, module) tuples
+    '''
+    result = subprocess.run([sys.executable, "-X", "importtime", script, "--help"],
+                            cwd=SRC_DIR, capture_output=True, text=True)
+    imports = []
+    for line in result.stderr.splitlines():
+        # import time: self [us] | cumulative | imported package
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, module = line[len("import time:"):].split("|")
+        imports.append((int(cumulative) / 1000, module.rstrip()))
+    return sorted(imports, reverse=True)[:count]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check the startup time of the command line entry points.")
+    parser.add_argument("--scripts", default=",".join(ENTRY_POINTS),
+                        help=f"Comma separated scripts, relative to src/ (default: {','.join(ENTRY_POINTS)}).")
+    parser.add_argument("--repeats", type=int, default=5,
+                        help="Runs per script, the median is compared with the budget (default: 5).")
+    parser.add_argument("--budget", type=float, default=0.5,
+                        help="Maximum median seconds of `<script> --help` (default: 0.5).")
+    parser.add_argument("--output", type=Path, help="Write the JSON report to this file instead of stdout.")
+    args = parser.parse_args()
+
+    scripts = [s.strip() for s in args.scripts.split(",") if s.strip()]
+    results, over_budget = [], []
+    for script in scripts:
+        timings = [run_help(script) for _ in range(args.repeats)]
+        median = statistics.median(timings)
+        results.append({"script": script, "median_s": median, "min_s": min(timings), "repeats": len(timings)})
+        print(f"{script:>20}  {median * 1000:8.1f} ms", file=sys.stderr)
+        if median > args.budget:
+            over_budget.append(script)
+
+    text = json.dumps({
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "budget_s": args.budget,
+        "results": results,
+    }, indent=2)
+    if args.output:
+        args.output.write_text(text)
+    else:
+        print(text)
+
+    if over_budget:
+        for script in over_budget:
+            print(f"`{script} --help` is over the {args.budget:g}s budget, slowest imports:", file=sys.stderr)
+            for cumulative_ms, module in slowest_imports(script):
+                print(f"  {cumulative_ms:9.1f} ms  {module}", file=sys.stderr)
+        sys.exit(1)
+    print("All entry points start within budget.", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+# src/crews/job_application/convergence.py
+import logging
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from crews.job_application.job_application_crew import JobApplicationCrew
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_THRESHOLD = 85.0
+DEFAULT_MAX_ITERATIONS = 5
+# missing keywords sent back per revision, most frequent in the job description first
+DEFAULT_TOP_K = 30
+# rough size of a token, to estimate the first revision before any token count is known
+CHARS_PER_TOKEN = 4
+
+
+def estimate_revision_tokens(inputs):
+    # the revision reads its inputs and writes about as much as the previous draft; agent and task
+    # prompts are not counted, so this is a lower bound
+    return (sum(len(str(value)) for value in inputs.values()) + len(inputs["previous_resume"])) // CHARS_PER_TOKEN
+
+
+def converged(scores, threshold):
+    # the tailoring goal: both the keyword match and the cosine similarity reach the threshold
+    return scores['keywords_match'] >= threshold and scores['cosine_similarity'] >= threshold
+
+
+class ConvergenceController:
+    """
+    Tailoring loop run in code instead of in the prompt: every draft is scored locally with the
+    crew's KeywordsAnalyzerTool and only the top_k missing key phrases and keywords go back to the
+    LLM. The loop stops when the threshold is reached, after max_iterations revisions, or when the
+    next revision would exceed the token budget (estimated from the previous one, or from the size
+    of its inputs for the first), so the number of LLM round trips per application is bounded.
+    """
+
+    def __init__(self, crew: "JobApplicationCrew", threshold: float = DEFAULT_THRESHOLD,
+                 max_iterations: int = DEFAULT_MAX_ITERATIONS, token_budget: int = None,
+                 top_k: int = DEFAULT_TOP_K):
+        self.crew = crew
+        self.threshold = threshold
+        self.max_iterations = max_iterations
+        self.token_budget = token_budget
+        self.top_k = top_k
+
+    def score(self, resume: str, job_description: str):
+        from tools.keywords_analyzer_tool import compact_result
+        return compact_result(self.crew.keyword_analyzer.analyze(resume, job_description), top_k=self.top_k)
+
+    def run(self) -> dict:
+        '''
+        This function revises the resume until it converges or a budget is exhausted.
+        Output: Dict with the best draft, its scores, the stop reason, the token usage and the
+                scores of every iteration
+        '''
+        documents = self.crew.document_inputs()
+        job_description = Path(self.crew.job_desc_path).read_text(encoding="utf-8")
+        draft = Path(self.crew.resume_path).read_text(encoding="utf-8")
+
+        history = []
+        best = None
+        total_tokens = 0
+        last_tokens = 0
+        iteration = 0
+        while True:
+            scores = self.score(draft, job_description)
+            history.append({
+                "iteration": iteration,
+                "keywords_match": scores['keywords_match'],
+                "cosine_similarity": scores['cosine_similarity'],
+                "missing_total": scores['missing_total'],
+                "tokens": last_tokens,
+            })
+            logger.info("📊 Iteration %d: keyword match %.2f%%, cosine similarity %.2f%%, %d keywords missing.",
+                        iteration, scores['keywords_match'], scores['cosine_similarity'], scores['missing_total'])
+
+            # a revision can score lower than the one before, keep the best draft
+            rank = min(scores['keywords_match'], scores['cosine_similarity'])
+            if iteration > 0 and (best is None or rank > best[0]):
+                best = (rank, draft, scores)
+
+            if converged(scores, self.threshold):
+                stop_reason = "threshold"
+                break
+            if not scores['missing_keywords']:
+                stop_reason = "no_missing_keywords"
+                break
+            if iteration >= self.max_iterations:
+                stop_reason = "max_iterations"
+                break
+
+            inputs = {
+                **documents,
+                "keywords_match": scores['keywords_match'],
+                "cosine_similarity": scores['cosine_similarity'],
+                # multi word skills first, they tell the LLM more than their words taken apart
+                "missing_keywords": ", ".join(scores['missing_phrases'] + scores['missing_keywords']),
+                "previous_resume": draft,
+            }
+            # checked before every revision, the first one included
+            estimate = last_tokens or estimate_revision_tokens(inputs)
+            if self.token_budget is not None and total_tokens + estimate > self.token_budget:
+                stop_reason = "token_budget"
+                break
+
+            iteration += 1
+            state = self.crew.revision_crew().kickoff(inputs=inputs)
+            draft = state.raw
+            last_tokens = state.token_usage.total_tokens if state.token_usage else 0
+            total_tokens += last_tokens
+
+        logger.info("🏁 Tailoring stopped after %d revisions (%s), %d tokens used.",
+                    iteration, stop_reason, total_tokens)
+        if best is None:
+            # no revision ran, the source resume is the result
+            best = (None, draft, scores)
+        return {
+            "resume": best[1],
+            "scores": best[2],
+            "converged": converged(best[2], self.threshold),
+            "stop_reason": stop_reason,
+            "iterations": iteration,
+            "total_tokens": total_tokens,
+            "threshold": self.threshold,
+            "history": history,
+        }
@@ -6,16 +6,12 @@ from pathlib import Path
 from typing import Any
 
 from crewai import Agent, Crew, Process, Task, LLM
-from crewai.project import CrewBase, agent, crew, task
+from crewai.project import CrewBase, agent, before_kickoff, crew, task
 
-from crewai_tools import SerperDevTool, FileReadTool, MDXSearchTool
-from crewai_tools.tools.directory_read_tool.directory_read_tool import DirectoryReadTool
-from crewai_tools.tools.file_writer_tool.file_writer_tool import FileWriterTool
-from crewai_tools.tools.scrape_website_tool.scrape_website_tool import ScrapeWebsiteTool
+from crews.llm import LLM_PROVIDER, get_llm_client
+from tools.ingest import ingest
 from tools.keywords_analyzer_tool import KeywordsAnalyzerTool
 
-# Choose a provider via env LLM_PROVIDER
-LLM_PROVIDER = os.getenv("LLM_PROVIDER", "openai").lower()
 # Default model names per provider (override via MODEL_NAME if needed)
 _default_models = {
     # "openai": "openai/o4-mini-2025-04-16",
@@ -27,19 +23,11 @@ _default_models = {
 }
 model_name = os.getenv("MODEL_NAME", _default_models.get(LLM_PROVIDER))
 
-# Build the LLM client
-api_key_env = f"{LLM_PROVIDER.upper()}_API_KEY"
-llm_client = LLM(
-    model=model_name,
-    api_key=os.getenv(api_key_env)
-)
-
 logger = logging.getLogger(__name__)
 
-logger.info(f"🧠 GenAI provider in use: {llm_client.model}")
-
-
-
+# Documents up to this many characters go into the task prompts; a longer one is read by the
+# agents with FileReadTool/MDXSearchTool
+DOCUMENT_INLINE_LIMIT = 60_000
 
 
 @CrewBase
@@ -53,25 +41,44 @@ class JobApplicationCrew:
     agents: Any
     tasks: Any
 
-    def __init__(self, resume_path: str, job_desc_path: str):
-        self.resume_path   = resume_path
-        self.job_desc_path = job_desc_path
+    def __init__(self, resume_path: str, job_desc_path: str, llm: LLM = None, human_input: bool = True,
+                 output_dir: str = None):
+        # The agents read the normalized text of the documents (PDF and DOCX included), extracted
+        # once per file content; pass these paths to kickoff
+        self._resume       = ingest(resume_path)
+        self._job_desc     = ingest(job_desc_path)
+        self.resume_path   = str(self._resume.text_path)
+        self.job_desc_path = str(self._job_desc.text_path)
+        # human_input=False turns off the review checkpoints, e.g. when crews run concurrently
+        self.human_input   = human_input
+        # where new_resume.md is written; defaults to the working directory
+        self.output_dir    = output_dir
+
+        # crewai_tools takes seconds to import, only pay for it when a crew is built
+        from crewai_tools import FileReadTool
+        from tools.embedding_store import PersistentMDXSearchTool
+        from tools.web_cache import CachedScrapeWebsiteTool, CachedSerperDevTool
 
         # Cache function for tools
         always_cache = lambda args, result: True
 
-        # Web search tool for gathering job posting and profile info
-        self._search_tool = SerperDevTool()
+        # Web search tool for gathering job posting and profile info; searches and pages also go
+        # through the on-disk web cache when WEB_CACHE_PATH is set
+        self._search_tool = CachedSerperDevTool()
         self._search_tool.cache_function = always_cache
-        self._scrape_website_tool = ScrapeWebsiteTool()
+        self._scrape_website_tool = CachedScrapeWebsiteTool()
 
         # File reading tool for reading personal writeups or local files
         self._file_read_tool = FileReadTool()
         # self._file_read_tool.cache_function = always_cache
 
-        self._llm = llm_client
+        self._llm = llm or get_llm_client(model_name)
+        # One analyzer shared by both agents: it caches the job description keyword profile,
+        # so each iteration of the tailoring loop only analyzes the new resume draft
         self._keyword_analyzer = KeywordsAnalyzerTool()
-        self._mdx_search_tool = MDXSearchTool()
+        # The resume and the job description are embedded once per content and embedding model,
+        # then found in the persistent store by every task and every later run
+        self._mdx_search_tool = PersistentMDXSearchTool()
 
     # ────────── Agents ──────────
     @agent
@@ -103,12 +110,58 @@ class JobApplicationCrew:
 
     @task
     def tailor_resume(self) -> Task:
-        return Task(config=self.tasks_config["tailor_resume"])
+        config = self.tasks_config["tailor_resume"]
+        if self.output_dir is None:
+            return Task(config=config)
+        # crewai strips the leading slash of plain absolute paths, a template keeps it;
+        # {output_dir} is filled in by add_output_dir
+        return Task(config=config, output_file="{output_dir}/" + config["output_file"])
+
+    @before_kickoff
+    def add_output_dir(self, inputs):
+        if self.output_dir is not None and inputs is not None:
+            inputs.setdefault("output_dir", str(Path(self.output_dir).resolve()))
+        return inputs
+
+    @property
+    def keyword_analyzer(self) -> KeywordsAnalyzerTool:
+        """
+        The KeywordsAnalyzerTool of the agents, to score drafts outside the crew with the job
+        description profile it already cached.
+        """
+        return self._keyword_analyzer
+
+    def document_inputs(self) -> dict:
+        """
+        Task inputs carrying the resume and the job description: their paths, and their text
+        ({resume}, {job_desc}) so the agents start working without reading the files first.
+        """
+        def inline(document):
+            if len(document.text) <= DOCUMENT_INLINE_LIMIT:
+                return document.text
+            return f"(too long to include here, read {document.text_path} with FileReadTool)"
+
+        return {
+            "resume_path": self.resume_path,
+            "job_desc_path": self.job_desc_path,
+            "resume": inline(self._resume),
+            "job_desc": inline(self._job_desc),
+        }
+
+    @before_kickoff
+    def add_documents(self, inputs):
+        inputs = {} if inputs is None else inputs
+        for key, value in self.document_inputs().items():
+            inputs.setdefault(key, value)
+        return inputs
 
     # ────────── Build Crew ──────────
 
     @crew
     def crew(self) -> Crew:
+        if not self.human_input:
+            for t in self.tasks:
+                t.human_input = False
 
         return Crew(
             agents=self.agents,
@@ -117,6 +170,26 @@ class JobApplicationCrew:
             verbose=True
         )
 
+    def revision_crew(self) -> Crew:
+        """
+        One-task crew revising a resume draft with the missing keywords, driven by the
+        convergence controller: the draft is scored outside the crew, so the strategist
+        gets no KeywordsAnalyzerTool and cannot delegate.
+        """
+        strategist = Agent(
+            config=self.agents_config["resume_strategist"],
+            tools=[self._file_read_tool],
+            llm=self._llm,
+            verbose=True,
+            allow_delegation=False
+        )
+        return Crew(
+            agents=[strategist],
+            tasks=[Task(config=self.tasks_config["revise_resume"], agent=strategist)],
+            process=Process.sequential,
+            verbose=True
+        )
+
 
 
 #
@@ -0,0 +1,27 @@
+import logging
+import os
+from functools import lru_cache
+
+from crewai import LLM
+
+from crews.llm_cache import cache_llm_responses
+
+logger = logging.getLogger(__name__)
+
+# Choose a provider via env LLM_PROVIDER
+LLM_PROVIDER = os.getenv("LLM_PROVIDER", "openai").lower()
+
+
+@lru_cache(maxsize=None)
+def get_llm_client(model_name: str) -> LLM:
+    """
+    Build the LLM client of a model on first use, with the on-disk response cache when
+    LLM_CACHE_PATH is set. Crews using the same model share the client.
+    """
+    api_key_env = f"{LLM_PROVIDER.upper()}_API_KEY"
+    llm_client = cache_llm_responses(LLM(
+        model=model_name,
+        api_key=os.getenv(api_key_env)
+    ))
+    logger.info(f"🧠 GenAI provider in use: {llm_client.model}")
+    return llm_client
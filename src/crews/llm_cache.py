@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+# src/crews/llm_cache.py
+import functools
+import hashlib
+import json
+import logging
+import os
+
+from tools.disk_cache import DiskCache
+
+logger = logging.getLogger(__name__)
+
+# Opt-in on-disk cache of LLM completions, shared by both crews.
+#   LLM_CACHE_PATH    SQLite file of the cache; the cache is off when it is not set
+#   LLM_CACHE_MODE    "readwrite" (default) calls the LLM on a miss and stores the answer,
+#                     "replay" never calls the network and fails on a miss
+#   LLM_CACHE_TTL     seconds a completion stays valid (default 7 days)
+#   LLM_CACHE_MAX_MB  size cap, least recently used completions are evicted first (default 512)
+CACHE_MODES = ("readwrite", "replay")
+DEFAULT_TTL = 7 * 24 * 3600
+
+# sampling parameters that change the completion, part of the cache key
+_KEY_ATTRIBUTES = ("model", "temperature", "top_p", "max_tokens", "max_completion_tokens", "stop", "seed",
+                   "response_format", "reasoning_effort")
+
+
+class LLMCacheMiss(RuntimeError):
+    """Raised in replay mode when a completion is not in the cache."""
+
+
+def _json_default(value):
+    # response models are keyed by their schema, tool instances by name and description
+    if isinstance(value, type) and hasattr(value, "model_json_schema"):
+        return value.model_json_schema()
+    if hasattr(value, "name") and hasattr(value, "description"):
+        return {"name": value.name, "description": value.description}
+    return repr(value)
+
+
+def response_cache_key(llm, messages, tools=None, response_model=None) -> str:
+    """
+    Key of a completion: model, messages, tools and sampling parameters.
+    """
+    payload = {attr: getattr(llm, attr, None) for attr in _KEY_ATTRIBUTES}
+    payload.update({
+        "messages": messages,
+        "tools": tools,
+        "response_model": response_model,
+    })
+    data = json.dumps(payload, sort_keys=True, default=_json_default)
+    return hashlib.sha256(data.encode("utf-8")).hexdigest()
+
+
+def cache_llm_responses(llm, cache: DiskCache = None, mode: str = None, ttl: float = None):
+    """
+    Wrap `llm.call` (and `llm.acall` when present) with the on-disk response cache.
+    The instance is returned unchanged when no cache is configured, so callers can always
+    write `llm_client = cache_llm_responses(LLM(...))`.
+    """
+    if cache is None:
+        path = os.getenv("LLM_CACHE_PATH", "").strip()
+        if not path:
+            return llm
+        cache = DiskCache(path, max_bytes=int(float(os.getenv("LLM_CACHE_MAX_MB", 512)) * 1024 * 1024))
+    mode = (mode or os.getenv("LLM_CACHE_MODE", "readwrite")).strip().lower()
+    if mode not in CACHE_MODES:
+        raise ValueError(f"LLM_CACHE_MODE must be one of {', '.join(CACHE_MODES)}, not `{mode}`.")
+    ttl = float(os.getenv("LLM_CACHE_TTL", DEFAULT_TTL)) if ttl is None else ttl
+
+    def lookup(messages, args, kwargs):
+        tools = kwargs.get("tools", args[0] if args else None)
+        key = response_cache_key(llm, messages, tools, kwargs.get("response_model"))
+        cached = cache.get("llm", key, ttl=ttl)
+        if cached is None and mode == "replay":
+            raise LLMCacheMiss(
+                f"LLM cache is in replay mode and has no completion for this {llm.model} request "
+                f"(key {key[:12]}). Run once with LLM_CACHE_MODE=readwrite to record it."
+            )
+        return key, cached
+
+    def store(key, result):
+        # only plain text completions are cached, structured outputs are returned as is
+        if isinstance(result, str):
+            cache.set("llm", key, result)
+        return result
+
+    call = llm.call
+
+    @functools.wraps(call)
+    def cached_call(messages, *args, **kwargs):
+        key, cached = lookup(messages, args, kwargs)
+        if cached is not None:
+            return cached
+        return store(key, call(messages, *args, **kwargs))
+
+    # the LLM may be a pydantic model, set the wrappers as plain instance attributes
+    object.__setattr__(llm, "call", cached_call)
+
+    acall = getattr(llm, "acall", None)
+    if acall is not None:
+        @functools.wraps(acall)
+        async def cached_acall(messages, *args, **kwargs):
+            key, cached = lookup(messages, args, kwargs)
+            if cached is not None:
+                return cached
+            return store(key, await acall(messages, *args, **kwargs))
+
+        object.__setattr__(llm, "acall", cached_acall)
+
+    logger.info("🗄️ LLM response cache enabled (%s, mode %s, ttl %ss).", cache.path, mode, int(ttl))
+    return llm
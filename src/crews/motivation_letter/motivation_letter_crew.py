@@ -8,13 +8,8 @@ from typing import Any
 from crewai import Agent, Crew, Process, Task, LLM
 from crewai.project import CrewBase, agent, crew, task
 
-from crewai_tools import SerperDevTool, FileReadTool, MDXSearchTool
-from crewai_tools.tools.directory_read_tool.directory_read_tool import DirectoryReadTool
-from crewai_tools.tools.file_writer_tool.file_writer_tool import FileWriterTool
-from crewai_tools.tools.scrape_website_tool.scrape_website_tool import ScrapeWebsiteTool
+from crews.llm import LLM_PROVIDER, get_llm_client
 
-# Choose a provider via env LLM_PROVIDER
-LLM_PROVIDER = os.getenv("LLM_PROVIDER", "openai").lower()
 # Default model names per provider (override via MODEL_NAME if needed)
 _default_models = {
     "openai": "openai/gpt-4.1-mini",
@@ -26,17 +21,8 @@ _default_models = {
 }
 model_name = os.getenv("MODEL_NAME", _default_models.get(LLM_PROVIDER))
 
-# Build the LLM client
-api_key_env = f"{LLM_PROVIDER.upper()}_API_KEY"
-llm_client = LLM(
-    model=model_name,
-    api_key=os.getenv(api_key_env)
-)
-
 logger = logging.getLogger(__name__)
 
-logger.info(f"🧠 GenAI provider in use: {llm_client.model}")
-
 @CrewBase
 class MotivationLetterCrew:
     """
@@ -47,14 +33,24 @@ class MotivationLetterCrew:
     agents: Any
     tasks: Any
 
-    def __init__(self, doc_path: str, company_url: str):
+    def __init__(self, doc_path: str, company_url: str, llm: LLM = None, human_input: bool = True):
         self.doc_path = doc_path
+        # human_input=False turns off the review checkpoints, e.g. when crews run concurrently
+        self.human_input = human_input
+        self._llm = llm or get_llm_client(model_name)
+
+        # crewai_tools takes seconds to import, only pay for it when a crew is built
+        from crewai_tools import FileReadTool
+        from crewai_tools.tools.directory_read_tool.directory_read_tool import DirectoryReadTool
+        from crewai_tools.tools.file_writer_tool.file_writer_tool import FileWriterTool
+        from tools.web_cache import CachedScrapeWebsiteTool, CachedSerperDevTool
 
         # Cache function for tools
         always_cache = lambda args, result: True
 
-        # Web search tool for gathering job posting and profile info
-        self._search_tool = SerperDevTool()
+        # Web search tool for gathering job posting and profile info; searches and pages also go
+        # through the on-disk web cache when WEB_CACHE_PATH is set
+        self._search_tool = CachedSerperDevTool()
         self._search_tool.cache_function = always_cache
 
         self._doc_dir_tool = DirectoryReadTool(directory=self.doc_path)
@@ -66,7 +62,7 @@ class MotivationLetterCrew:
 
         self._file_write_tool = FileWriterTool()
 
-        self._scrape_website_tool = ScrapeWebsiteTool(website_url=company_url)
+        self._scrape_website_tool = CachedScrapeWebsiteTool(website_url=company_url)
     # ────────── Agents ──────────
 
 
@@ -75,7 +71,7 @@ class MotivationLetterCrew:
         return Agent(
             config=self.agents_config["resume_project_manager"],
             # tools=[self._search_tool, self._doc_dir_tool, self._file_read_tool],
-            llm=llm_client,
+            llm=self._llm,
             verbose=True,
             allow_delegation=True
         )
@@ -90,7 +86,7 @@ class MotivationLetterCrew:
                 self._file_write_tool,
                 self._scrape_website_tool
             ],
-            llm=llm_client,
+            llm=self._llm,
             verbose=True,
             allow_delegation=False
         )
@@ -105,6 +101,9 @@ class MotivationLetterCrew:
 
     @crew
     def crew(self) -> Crew:
+        if not self.human_input:
+            for t in self.tasks:
+                t.human_input = False
         manager = self.resume_project_manager()
         operational_agents = [a for a in self.agents if a is not manager]
         return Crew(
@@ -112,7 +111,7 @@ class MotivationLetterCrew:
             tasks=self.tasks,
             process=Process.hierarchical,
             manager_agent=manager,
-            manager_llm=llm_client,
+            manager_llm=self._llm,
             planning=True,
             verbose=True
         )
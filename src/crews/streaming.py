@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+# src/crews/streaming.py
+import json
+import sys
+import threading
+import time
+from pathlib import Path
+
+from crewai.events import LLMStreamChunkEvent, crewai_event_bus
+
+# ReAct style answers start with the agent's reasoning; only what follows the marker is the document
+FINAL_ANSWER = "Final Answer:"
+_REASONING_PREFIXES = ("Thought", "Action")
+
+
+class FinalTaskStream:
+    """
+    Forwards the LLM tokens of a crew's final task to stdout and to the task's output file as
+    they arrive (`with FinalTaskStream(crew.tasks[-1]):`). The LLM must be created with stream=True.
+
+    Every LLM call of the task that turns out to be an answer restarts the file, reasoning steps and
+    tool calls are skipped. When the task completes crewai writes its final output to the same file,
+    so the file ends up identical to a run without streaming; answers served by the LLM response
+    cache arrive in one piece at that point.
+    """
+
+    def __init__(self, task, out=sys.stdout):
+        self.task = task
+        self.task_id = str(task.id)
+        self.out = out
+        self._calls = {}
+        self._file = None
+
+    def __enter__(self):
+        crewai_event_bus.on(LLMStreamChunkEvent)(self._on_chunk)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        crewai_event_bus.off(LLMStreamChunkEvent, self._on_chunk)
+        self._close_file()
+        return False
+
+    def _on_chunk(self, source, event):
+        if str(event.task_id) != self.task_id or event.tool_call is not None or not event.chunk:
+            return
+        call = self._calls.setdefault(event.call_id, {"state": "pending", "buffer": ""})
+        if call["state"] == "answer":
+            self._forward(event.chunk)
+            return
+
+        call["buffer"] += event.chunk
+        text = call["buffer"].lstrip()
+        if call["state"] == "pending":
+            # wait for enough text to tell an answer from a reasoning step
+            if len(text) < max(map(len, _REASONING_PREFIXES)) and FINAL_ANSWER not in text:
+                return
+            call["state"] = "reasoning" if text.startswith(_REASONING_PREFIXES) else "answer"
+            if call["state"] == "answer":
+                self._start_answer(text)
+                return
+        if FINAL_ANSWER in text:
+            call["state"] = "answer"
+            self._start_answer(text.split(FINAL_ANSWER, 1)[1].lstrip())
+
+    def _start_answer(self, text):
+        self._close_file()
+        self.out.write("\n")
+        # read when the answer starts: crewai fills in the templates of output_file at kickoff
+        if self.task.output_file:
+            output_file = Path(self.task.output_file)
+            output_file.parent.mkdir(parents=True, exist_ok=True)
+            self._file = open(output_file, "w", encoding="utf-8")
+        self._forward(text)
+
+    def _forward(self, text):
+        self.out.write(text)
+        self.out.flush()
+        if self._file is not None:
+            self._file.write(text)
+            self._file.flush()
+
+    def _close_file(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+class TaskEventLog:
+    """
+    Crew task_callback appending one JSON line per completed task to a log file, so the result of
+    every task is on disk as soon as it is available. One instance can serve several crews.
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+
+    def __call__(self, output):
+        record = {
+            "event": "task_completed",
+            "timestamp": time.time(),
+            "task": output.name,
+            "agent": output.agent.strip() if output.agent else None,
+            "raw": output.raw,
+        }
+        with self._lock, open(self.path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(record) + "\n")
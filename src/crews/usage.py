@@ -0,0 +1,280 @@
+#!/usr/bin/env python3
+# src/crews/usage.py
+import logging
+import os
+import threading
+import time
+from collections import defaultdict
+
+from crewai.events import (
+    AgentExecutionCompletedEvent,
+    AgentExecutionStartedEvent,
+    LLMCallCompletedEvent,
+    LLMCallFailedEvent,
+    LLMCallStartedEvent,
+    TaskCompletedEvent,
+    TaskStartedEvent,
+    ToolUsageErrorEvent,
+    ToolUsageFinishedEvent,
+    crewai_event_bus,
+)
+from crewai.hooks import HookAborted, register_before_llm_call_hook, unregister_before_llm_call_hook
+from crewai.types.usage_metrics import UsageMetrics
+
+logger = logging.getLogger(__name__)
+
+# Optional run budgets, checked before every LLM call; unset means unlimited.
+#   BUDGET_MAX_TOKENS     prompt + completion tokens of the whole run
+#   BUDGET_MAX_SECONDS    wall time of the whole run
+#   BUDGET_MAX_LLM_CALLS  number of LLM calls of the whole run
+BUDGET_ENV = {
+    "max_tokens": "BUDGET_MAX_TOKENS",
+    "max_seconds": "BUDGET_MAX_SECONDS",
+    "max_llm_calls": "BUDGET_MAX_LLM_CALLS",
+}
+
+
+class BudgetExceeded(HookAborted):
+    """Raised before an LLM call when the run is over one of its budgets."""
+
+
+def agent_names(*crew_bases):
+    '''
+    This function maps the roles of the agents of CrewBase instances to their config names,
+    so the report says `resume_strategist` instead of the full role text.
+    Input: CrewBase instances (JobApplicationCrew, MotivationLetterCrew)
+    Output: Dict role -> agent name
+    '''
+    names = {}
+    for crew_base in crew_bases:
+        for name, config in crew_base.agents_config.items():
+            if isinstance(config, dict) and config.get("role"):
+                names[config["role"].strip()] = name
+    return names
+
+
+def _counters():
+    return {"llm_calls": 0, "prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0,
+            "llm_seconds": 0.0, "seconds": 0.0}
+
+
+class UsageTracker:
+    """
+    Per-agent, per-task and per-tool accounting of LLM tokens and wall time, collected from the
+    crewai event bus while the tracker is active (`with UsageTracker(...) as usage:`), and optional
+    budgets that abort the run with BudgetExceeded before the LLM call that would go over them.
+
+    Events are delivered on the bus worker threads, so the budgets may be crossed by the calls
+    already in flight, never by a new one. With `crew` only the events of that crew are counted,
+    for crews running concurrently in one process (gen_batch.py).
+    """
+
+    def __init__(self, max_tokens: int = None, max_seconds: float = None, max_llm_calls: int = None,
+                 agent_names: dict = None, crew=None):
+        self.max_tokens = max_tokens
+        self.max_seconds = max_seconds
+        self.max_llm_calls = max_llm_calls
+        self.agent_names = agent_names or {}
+        self.crew = crew
+        self.aborted = None
+
+        self._lock = threading.Lock()
+        self._started = None
+        self._finished = None
+        self._totals = _counters()
+        self._agents = defaultdict(_counters)
+        self._tasks = defaultdict(_counters)
+        self._tool_calls = []
+        self._scope = set()
+        # start time of the running LLM calls, tasks and agent executions
+        self._open = {}
+
+        self._handlers = [
+            (LLMCallStartedEvent, self._on_llm_started),
+            (LLMCallCompletedEvent, self._on_llm_completed),
+            (LLMCallFailedEvent, self._on_llm_failed),
+            (TaskStartedEvent, self._on_task_started),
+            (TaskCompletedEvent, self._on_task_completed),
+            (AgentExecutionStartedEvent, self._on_agent_started),
+            (AgentExecutionCompletedEvent, self._on_agent_completed),
+            (ToolUsageFinishedEvent, self._on_tool_finished),
+            (ToolUsageErrorEvent, self._on_tool_error),
+        ]
+
+    @classmethod
+    def from_env(cls, agent_names: dict = None, crew=None):
+        budgets = {}
+        for name, env in BUDGET_ENV.items():
+            value = os.getenv(env, "").strip()
+            if value:
+                budgets[name] = float(value) if name == "max_seconds" else int(value)
+        return cls(agent_names=agent_names, crew=crew, **budgets)
+
+    # ────────── Lifecycle ──────────
+
+    def __enter__(self):
+        self._started = time.monotonic()
+        if self.crew is not None:
+            # events only carry the ids of their agent and task
+            members = [*self.crew.agents, *self.crew.tasks, self.crew.manager_agent]
+            self._scope = {str(member.id) for member in members if member is not None}
+        for event_type, handler in self._handlers:
+            crewai_event_bus.on(event_type)(handler)
+        register_before_llm_call_hook(self._check_budgets)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        unregister_before_llm_call_hook(self._check_budgets)
+        # let the bus deliver the events of the last calls before reading the counters
+        crewai_event_bus.flush()
+        for event_type, handler in self._handlers:
+            crewai_event_bus.off(event_type, handler)
+        self._finished = time.monotonic()
+        if isinstance(exc, BudgetExceeded):
+            logger.error("🛑 Run aborted: %s", exc)
+        return False
+
+    def _check_budgets(self, context):
+        if self.crew is not None and context.crew is not self.crew:
+            return None
+        with self._lock:
+            elapsed = time.monotonic() - self._started
+            reason = None
+            if self.max_tokens is not None and self._totals["total_tokens"] >= self.max_tokens:
+                reason = f"token budget of {self.max_tokens} exhausted ({self._totals['total_tokens']} tokens used)"
+            elif self.max_llm_calls is not None and self._totals["llm_calls"] >= self.max_llm_calls:
+                reason = f"LLM call budget of {self.max_llm_calls} exhausted"
+            elif self.max_seconds is not None and elapsed >= self.max_seconds:
+                reason = f"time budget of {self.max_seconds:g}s exhausted ({elapsed:.1f}s elapsed)"
+            if reason is None:
+                return None
+            self.aborted = reason
+        raise BudgetExceeded(reason, source="UsageTracker")
+
+    # ────────── Event handlers ──────────
+
+    def _in_scope(self, event):
+        if self.crew is None:
+            return True
+        return str(event.agent_id) in self._scope or str(event.task_id) in self._scope
+
+    def _agent(self, event):
+        role = (event.agent_role or getattr(getattr(event, "agent", None), "role", None) or "").strip()
+        return self.agent_names.get(role, role or "unknown")
+
+    def _task(self, event):
+        return event.task_name or getattr(getattr(event, "task", None), "name", None) or "unknown"
+
+    def _on_llm_started(self, source, event):
+        if not self._in_scope(event):
+            return
+        with self._lock:
+            self._open[("llm", event.call_id)] = event.timestamp
+
+    def _on_llm_completed(self, source, event):
+        metrics = UsageMetrics.from_provider_dict(event.usage) or UsageMetrics()
+        self._close_llm_call(event, metrics)
+
+    def _on_llm_failed(self, source, event):
+        self._close_llm_call(event, UsageMetrics())
+
+    def _close_llm_call(self, event, metrics):
+        if not self._in_scope(event):
+            return
+        with self._lock:
+            started = self._open.pop(("llm", event.call_id), None)
+            seconds = (event.timestamp - started).total_seconds() if started else 0.0
+            for counters in (self._totals, self._agents[self._agent(event)], self._tasks[self._task(event)]):
+                counters["llm_calls"] += 1
+                counters["prompt_tokens"] += metrics.prompt_tokens
+                counters["completion_tokens"] += metrics.completion_tokens
+                counters["total_tokens"] += metrics.total_tokens
+                counters["llm_seconds"] += seconds
+
+    def _on_task_started(self, source, event):
+        if not self._in_scope(event):
+            return
+        with self._lock:
+            self._open[("task", self._task(event))] = event.timestamp
+
+    def _on_task_completed(self, source, event):
+        if not self._in_scope(event):
+            return
+        with self._lock:
+            name = self._task(event)
+            started = self._open.pop(("task", name), None)
+            if started:
+                self._tasks[name]["seconds"] += (event.timestamp - started).total_seconds()
+
+    def _on_agent_started(self, source, event):
+        if not self._in_scope(event):
+            return
+        with self._lock:
+            self._open[("agent", id(event.agent), id(event.task))] = event.timestamp
+
+    def _on_agent_completed(self, source, event):
+        if not self._in_scope(event):
+            return
+        with self._lock:
+            started = self._open.pop(("agent", id(event.agent), id(event.task)), None)
+            if started:
+                self._agents[self._agent(event)]["seconds"] += (event.timestamp - started).total_seconds()
+
+    def _on_tool_finished(self, source, event):
+        self._record_tool_call(event, error=None)
+
+    def _on_tool_error(self, source, event):
+        self._record_tool_call(event, error=str(event.error))
+
+    def _record_tool_call(self, event, error):
+        if not self._in_scope(event):
+            return
+        started = getattr(event, "started_at", None)
+        finished = getattr(event, "finished_at", None) or event.timestamp
+        with self._lock:
+            self._tool_calls.append({
+                "tool": event.tool_name,
+                "agent": self._agent(event),
+                "task": self._task(event),
+                "seconds": round((finished - started).total_seconds(), 3) if started else None,
+                "from_cache": bool(getattr(event, "from_cache", False)),
+                "error": error,
+            })
+
+    # ────────── Report ──────────
+
+    def report(self) -> dict:
+        '''
+        This function summarizes the usage of the run, for application_state.json.
+        Output: Dict with the totals, the per-agent, per-task and per-tool counters, every tool
+                call, the budgets and the abort reason (None when the run was not aborted)
+        '''
+        def rounded(counters):
+            return {key: round(value, 3) if isinstance(value, float) else value for key, value in counters.items()}
+
+        with self._lock:
+            end = self._finished if self._finished is not None else time.monotonic()
+            totals = rounded(self._totals)
+            totals["seconds"] = round(end - self._started, 3) if self._started is not None else 0.0
+
+            tools = defaultdict(lambda: {"calls": 0, "seconds": 0.0, "from_cache": 0, "errors": 0})
+            for call in self._tool_calls:
+                summary = tools[call["tool"]]
+                summary["calls"] += 1
+                summary["seconds"] = round(summary["seconds"] + (call["seconds"] or 0.0), 3)
+                summary["from_cache"] += call["from_cache"]
+                summary["errors"] += call["error"] is not None
+
+            return {
+                "total": totals,
+                "agents": {name: rounded(counters) for name, counters in self._agents.items()},
+                "tasks": {name: rounded(counters) for name, counters in self._tasks.items()},
+                "tools": dict(tools),
+                "tool_calls": list(self._tool_calls),
+                "budgets": {
+                    "max_tokens": self.max_tokens,
+                    "max_seconds": self.max_seconds,
+                    "max_llm_calls": self.max_llm_calls,
+                },
+                "aborted": self.aborted,
+            }
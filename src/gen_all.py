@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+import sys
+import json
+import asyncio
+import logging
+import argparse
+from pathlib import Path
+
+from gen_application import check_llm_provider, init_tracing
+
+# Default output directory to write CrewAI state
+OUTPUT_DIR = "docs/"
+DEFAULT_JOB_POSTING_URL = "N/A"
+
+logger = logging.getLogger(__name__)
+
+
+def dump_state(state):
+    return state.model_dump() if hasattr(state, "model_dump") else dict(state)
+
+
+async def run_crews(application_crew, application_inputs, motivation_crew, motivation_inputs):
+    """
+    Kick off both crews at once; each waits on LLM I/O most of the time, so the
+    end-to-end time approaches the longer of the two crews instead of their sum.
+    """
+    return await asyncio.gather(
+        application_crew.kickoff_async(inputs=application_inputs),
+        motivation_crew.kickoff_async(inputs=motivation_inputs),
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Run the JobApplicationCrew and the MotivationLetterCrew concurrently for one application."
+    )
+    parser.add_argument(
+        "--resume",
+        type=Path,
+        required=True,
+        help="Path to the resume file (plain text or PDF)."
+    )
+    parser.add_argument(
+        "--job_desc",
+        type=Path,
+        required=True,
+        help="Path to the job description file (plain text)."
+    )
+    parser.add_argument(
+        "--company_url",
+        required=True,
+        help="Public URL of the company (fills {company_url})"
+    )
+    parser.add_argument(
+        "--job_posting_url",
+        default=DEFAULT_JOB_POSTING_URL,
+        help="URL of the job posting (fills {job_posting_url})"
+    )
+    parser.add_argument(
+        "--doc_path",
+        type=Path,
+        default=Path(OUTPUT_DIR),
+        help="Directory to write output files"
+    )
+    args = parser.parse_args()
+
+    resume_path = args.resume.expanduser().resolve()
+    job_desc_path = args.job_desc.expanduser().resolve()
+    for label, path in (("Resume", resume_path), ("Job description", job_desc_path)):
+        if not path.exists():
+            logger.error("❌ %s file `%s` does not exist.", label, path)
+            raise FileNotFoundError(f"{label} file `{path}` does not exist.")
+
+    check_llm_provider()
+    init_tracing()
+
+    from crews.job_application.job_application_crew import JobApplicationCrew
+    from crews.job_application.job_application_crew import model_name as application_model
+    from crews.llm import get_llm_client
+    from crews.motivation_letter.motivation_letter_crew import MotivationLetterCrew
+    from crews.motivation_letter.motivation_letter_crew import model_name as motivation_model
+    from crews.usage import BudgetExceeded, UsageTracker, agent_names
+
+    out_dir = args.doc_path.expanduser().resolve()
+    out_dir.mkdir(parents=True, exist_ok=True)
+
+    out_file = out_dir / "application_state.json"
+    try:
+        # Each crew keeps its own model; crews on the same model share one LLM client. The
+        # motivation letter cannot wait for the tailored resume, so it reads the source resume;
+        # human review checkpoints are turned off because two crews cannot prompt on the same
+        # terminal at once.
+        application = JobApplicationCrew(resume_path, job_desc_path, llm=get_llm_client(application_model),
+                                         human_input=False)
+        motivation = MotivationLetterCrew(str(out_dir), args.company_url, llm=get_llm_client(motivation_model),
+                                          human_input=False)
+        usage = UsageTracker.from_env(agent_names(application, motivation))
+        application_crew = application.crew()
+        motivation_crew = motivation.crew()
+
+        with usage:
+            application_state, motivation_state = asyncio.run(run_crews(
+                application_crew,
+                {
+                    "resume_path": application.resume_path,
+                    "job_desc_path": application.job_desc_path,
+                },
+                motivation_crew,
+                {
+                    "company_url": args.company_url,
+                    "job_posting_url": args.job_posting_url,
+                    "resume_file": application.resume_path,
+                },
+            ))
+
+        with open(out_file, "w") as f:
+            json.dump(
+                {
+                    "application": dump_state(application_state),
+                    "motivation_letter": dump_state(motivation_state),
+                    "usage": usage.report(),
+                },
+                f,
+                indent=2
+            )
+
+        logger.info("✅ Done. Application state written to `%s`.", out_file)
+    except BudgetExceeded as e:
+        # keep the accounting of the aborted run, it shows where the budget went
+        with open(out_file, "w") as f:
+            json.dump({"usage": usage.report()}, f, indent=2)
+        logger.error("❌ Budget exceeded: %s. Usage written to `%s`.", e, out_file)
+        sys.exit(1)
+    except Exception:
+        logger.exception("💥 An unexpected error occurred:")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
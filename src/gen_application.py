@@ -5,13 +5,18 @@ import json
 import logging
 import argparse
 from pathlib import Path
-from crews.job_application.job_application_crew import JobApplicationCrew
-import sys, os, shutil, subprocess, json
-from langtrace_python_sdk import langtrace
-langtrace.init(api_key = os.getenv("LANGTRACE_API_KEY"))
+from contextlib import nullcontext
+from crews.job_application.convergence import DEFAULT_MAX_ITERATIONS, DEFAULT_THRESHOLD, DEFAULT_TOP_K
+
+# crewai, the crews and langtrace take seconds to import: they are imported once the arguments
+# are parsed and checked, so `--help` and usage errors return immediately
 
 # Default output directory to write CrewAI state
 OUTPUT_DIR = "docs/"
+# Tailored resume written by --converge, where gen_motivation.py reads it by default
+DEFAULT_RESUME_FILE = "new_resume.md"
+# JSON line per completed task, written by --stream
+EVENT_LOG_FILE = "events.jsonl"
 
 # Configure root logger
 logging.basicConfig(
@@ -22,6 +27,87 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+def check_llm_provider():
+    """
+    Ensure an LLM provider is set, and that its API key is present.
+    """
+    llm = os.getenv("LLM_PROVIDER", "").upper().strip()
+    if not llm:
+        logger.error(
+            "❌ LLM_PROVIDER is not set. You must set an LLM provider in the environment, e.g. export LLM_PROVIDER=openai, "
+            "and also set the corresponding API key (e.g. export OPENAI_API_KEY=...)."
+        )
+        raise EnvironmentError(
+            "LLM_PROVIDER must be set in the environment — for example, `export LLM_PROVIDER=openai` — "
+            "and you must also export the matching API key (e.g. `export OPENAI_API_KEY=<your_key>`)."
+        )
+
+    api_key_env = f"{llm}_API_KEY"
+    api_key = os.getenv(api_key_env, "").strip()
+    if not api_key:
+        logger.error(
+            "❌ API key for `%s` is not set. Please export `%s` in your environment.",
+            llm, api_key_env
+        )
+        raise EnvironmentError(
+            f"The environment variable `{api_key_env}` is not set. You must export your {llm} API key, "
+            f"for example: `export {api_key_env}=<your_api_key>`."
+        )
+
+    logger.info("🧠 GenAI provider in use: %s", llm)
+    return llm
+
+def init_tracing():
+    """
+    Initialize LangTrace, before the crews are imported and run.
+    """
+    from langtrace_python_sdk import langtrace
+    langtrace.init(api_key=os.getenv("LANGTRACE_API_KEY"))
+
+def run_convergence(resume_path: Path, job_desc_path: Path, out_dir: Path, args):
+    """
+    Tailor the resume with the ConvergenceController instead of the prompt-driven loop.
+    The best draft goes to new_resume.md, the scores of every iteration to application_state.json.
+    """
+    from crews.job_application.convergence import ConvergenceController
+    from crews.job_application.job_application_crew import JobApplicationCrew
+    from crews.usage import BudgetExceeded, UsageTracker, agent_names
+
+    out_file = out_dir / "application_state.json"
+    try:
+        crew = JobApplicationCrew(resume_path, job_desc_path, human_input=False)
+        usage = UsageTracker.from_env(agent_names(crew))
+        controller = ConvergenceController(
+            crew,
+            threshold=args.threshold,
+            max_iterations=args.max_iterations,
+            token_budget=args.token_budget,
+            top_k=args.top_k,
+        )
+        with usage:
+            result = controller.run()
+        result["usage"] = usage.report()
+
+        Path(DEFAULT_RESUME_FILE).write_text(result["resume"], encoding="utf-8")
+        with open(out_file, "w") as f:
+            json.dump(result, f, indent=2)
+
+        if result["converged"]:
+            logger.info("✅ Done. Resume reached %.0f%% after %d revisions.", args.threshold, result["iterations"])
+        else:
+            logger.warning("⚠️ Resume did not reach %.0f%% (%s): keyword match %.2f%%, cosine similarity %.2f%%.",
+                           args.threshold, result["stop_reason"], result["scores"]["keywords_match"],
+                           result["scores"]["cosine_similarity"])
+        logger.info("📝 Resume written to `%s`, application state to `%s`.", DEFAULT_RESUME_FILE, out_file)
+    except BudgetExceeded as e:
+        with open(out_file, "w") as f:
+            json.dump({"usage": usage.report()}, f, indent=2)
+        logger.error("❌ Budget exceeded: %s. Usage written to `%s`.", e, out_file)
+        sys.exit(1)
+    except Exception:
+        logger.exception("💥 An unexpected error occurred:")
+        sys.exit(1)
+
 def main():
     parser = argparse.ArgumentParser(description="Run the JobApplicationCrew with a resume and job description.")
     parser.add_argument(
@@ -36,7 +122,51 @@ def main():
         required=True,
         help="Path to the job description file (plain text)."
     )
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="Print the tailored resume as the LLM writes it, and log each task result to docs/events.jsonl."
+    )
+    parser.add_argument(
+        "--converge",
+        action="store_true",
+        help="Run the tailoring loop in code: score each draft locally and send back only the missing keywords."
+    )
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=DEFAULT_THRESHOLD,
+        help="With --converge, keyword match and cosine similarity to reach, in percent (default: 85)."
+    )
+    parser.add_argument(
+        "--max_iterations",
+        type=int,
+        default=DEFAULT_MAX_ITERATIONS,
+        help="With --converge, maximum number of LLM revisions (default: 5)."
+    )
+    parser.add_argument(
+        "--token_budget",
+        type=int,
+        help="With --converge, stop before a revision would take the run over this many LLM tokens."
+    )
+    parser.add_argument(
+        "--top_k",
+        type=int,
+        default=DEFAULT_TOP_K,
+        help="With --converge, missing key phrases and keywords sent back per revision, most frequent first "
+             "(default: 30)."
+    )
     args = parser.parse_args()
+    if args.stream and args.converge:
+        parser.error("--stream cannot be combined with --converge")
+    if not 0 < args.threshold <= 100:
+        parser.error("--threshold must be above 0 and at most 100")
+    if args.max_iterations < 1:
+        parser.error("--max_iterations must be at least 1")
+    if args.token_budget is not None and args.token_budget <= 0:
+        parser.error("--token_budget must be positive")
+    if args.top_k < 1:
+        parser.error("--top_k must be at least 1")
 
     # Resolve to absolute paths
     resume_path = args.resume.expanduser().resolve()
@@ -53,54 +183,58 @@ def main():
     logger.info("📄 Resume path: %s", resume_path)
     logger.info("📄 Job description path: %s", job_desc_path)
 
-    # Ensure an LLM provider is set, and that its API key is present
-    llm = os.getenv("LLM_PROVIDER", "").upper().strip()
-    if not llm:
-        logger.error(
-            "❌ LLM_PROVIDER is not set. You must set an LLM provider in the environment, e.g. export LLM_PROVIDER=openai, "
-            "and also set the corresponding API key (e.g. export OPENAI_API_KEY=...)."
-        )
-        raise EnvironmentError(
-            "LLM_PROVIDER must be set in the environment — for example, `export LLM_PROVIDER=openai` — "
-            "and you must also export the matching API key (e.g. `export OPENAI_API_KEY=<your_key>`)."
-        )
-
-    api_key_env = f"{llm}_API_KEY"
-    api_key = os.getenv(api_key_env, "").strip()
-    if not api_key:
-        logger.error(
-            "❌ API key for `%s` is not set. Please export `%s` in your environment.",
-            llm, api_key_env
-        )
-        raise EnvironmentError(
-            f"The environment variable `{api_key_env}` is not set. You must export your {llm} API key, "
-            f"for example: `export {api_key_env}=<your_api_key>`."
-        )
-
-    logger.info("🧠 GenAI provider in use: %s", llm)
+    check_llm_provider()
+    init_tracing()
 
     out_dir = Path(OUTPUT_DIR).expanduser().resolve()
     if not out_dir.exists():
         out_dir.mkdir(parents=True, exist_ok=True)
 
+    if args.converge:
+        run_convergence(resume_path, job_desc_path, out_dir, args)
+        return
+
+    from crews.job_application.job_application_crew import JobApplicationCrew, model_name
+    from crews.llm import get_llm_client
+    from crews.streaming import FinalTaskStream, TaskEventLog
+    from crews.usage import BudgetExceeded, UsageTracker, agent_names
+
+    out_file = out_dir / "application_state.json"
     try:
         # Initialize and run the crew, passing both resume and job description
-        crew = JobApplicationCrew(resume_path, job_desc_path).crew()
-        state = crew.kickoff({
-            "resume_path": str(resume_path),
-            "job_desc_path": str(job_desc_path),
-        })
-
-        # Write out the application state
-        out_file = out_dir / "application_state.json"
+        application = JobApplicationCrew(resume_path, job_desc_path)
+        usage = UsageTracker.from_env(agent_names(application))
+        crew = application.crew()
+        stream = nullcontext()
+        if args.stream:
+            # tokens of the final task go to stdout and new_resume.md, task results to the event log
+            get_llm_client(model_name).stream = True
+            crew.task_callback = TaskEventLog(out_dir / EVENT_LOG_FILE)
+            stream = FinalTaskStream(crew.tasks[-1])
+        with usage, stream:
+            state = crew.kickoff({
+                "resume_path": application.resume_path,
+                "job_desc_path": application.job_desc_path,
+            })
+
+        # Write out the application state, with the token and time usage of the run
         with open(out_file, "w") as f:
             json.dump(
-                state.model_dump() if hasattr(state, "model_dump") else dict(state),
+                {
+                    **(state.model_dump() if hasattr(state, "model_dump") else dict(state)),
+                    "usage": usage.report(),
+                },
                 f,
                 indent=2
             )
 
         logger.info("✅ Done. Application state written to `%s`.", out_file)
+    except BudgetExceeded as e:
+        # keep the accounting of the aborted run, it shows where the budget went
+        with open(out_file, "w") as f:
+            json.dump({"usage": usage.report()}, f, indent=2)
+        logger.error("❌ Budget exceeded: %s. Usage written to `%s`.", e, out_file)
+        sys.exit(1)
     except Exception:
         logger.exception("💥 An unexpected error occurred:")
         sys.exit(1)
@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+import os
+import sys
+import csv
+import json
+import time
+import asyncio
+import logging
+import argparse
+from pathlib import Path
+
+from gen_application import check_llm_provider, init_tracing
+
+# Default root directory of the per-job outputs
+OUTPUT_DIR = "batch_output/"
+STATUS_FILE = "status.json"
+
+logger = logging.getLogger(__name__)
+
+
+def read_manifest(manifest: Path):
+    """
+    Read the resume/job description pairs of a CSV (with a header row) or JSONL manifest.
+    Each entry needs `resume` and `job_desc`, and may set an `id`; relative paths are
+    resolved against the manifest directory.
+    """
+    with open(manifest, newline="", encoding="utf-8") as f:
+        if manifest.suffix.lower() == ".jsonl":
+            rows = [json.loads(line) for line in f if line.strip()]
+        else:
+            rows = list(csv.DictReader(f))
+
+    jobs, seen = [], set()
+    for n, row in enumerate(rows, start=1):
+        if not row.get("resume") or not row.get("job_desc"):
+            raise ValueError(f"Manifest entry {n} needs both `resume` and `job_desc`: {row}")
+        resume = (manifest.parent / row["resume"]).expanduser().resolve()
+        job_desc = (manifest.parent / row["job_desc"]).expanduser().resolve()
+        job_id = row.get("id") or f"{n:04d}-{resume.stem}-{job_desc.stem}"
+        if job_id in seen:
+            raise ValueError(f"Duplicate job id `{job_id}` in manifest entry {n}")
+        seen.add(job_id)
+        jobs.append({"id": job_id, "resume": resume, "job_desc": job_desc})
+    return jobs
+
+
+def read_status(job_dir: Path):
+    try:
+        return json.loads((job_dir / STATUS_FILE).read_text(encoding="utf-8"))
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+
+
+def write_json(path: Path, data, indent=None):
+    # write then rename, so a killed run never leaves a truncated file behind
+    tmp = path.with_suffix(path.suffix + ".tmp")
+    with open(tmp, "w") as f:
+        json.dump(data, f, indent=indent)
+    os.replace(tmp, path)
+
+
+async def run_job(job, out_dir: Path, semaphore: asyncio.Semaphore):
+    from crews.job_application.job_application_crew import JobApplicationCrew, model_name
+    from crews.llm import get_llm_client
+    from crews.usage import BudgetExceeded, UsageTracker, agent_names
+
+    job_dir = out_dir / job["id"]
+    job_dir.mkdir(parents=True, exist_ok=True)
+
+    async with semaphore:
+        started_at = time.time()
+        logger.info("🚀 Job `%s` started.", job["id"])
+        try:
+            for label, path in (("Resume", job["resume"]), ("Job description", job["job_desc"])):
+                if not path.exists():
+                    raise FileNotFoundError(f"{label} file `{path}` does not exist.")
+
+            # building the crew (tools, embeddings) blocks, keep it off the event loop
+            application = await asyncio.to_thread(
+                lambda: JobApplicationCrew(job["resume"], job["job_desc"], llm=get_llm_client(model_name), human_input=False,
+                                           output_dir=str(job_dir))
+            )
+            crew = application.crew()
+            # jobs share the event bus, the tracker only counts the events of this job's crew
+            usage = UsageTracker.from_env(agent_names(application), crew=crew)
+            with usage:
+                state = await crew.kickoff_async(inputs={
+                    "resume_path": application.resume_path,
+                    "job_desc_path": application.job_desc_path,
+                })
+            write_json(job_dir / "application_state.json", {
+                **(state.model_dump() if hasattr(state, "model_dump") else dict(state)),
+                "usage": usage.report(),
+            }, indent=2)
+            status = {"status": "done"}
+            logger.info("✅ Job `%s` done.", job["id"])
+        except Exception as e:
+            logger.exception("💥 Job `%s` failed:", job["id"])
+            status = {"status": "failed", "error": f"{type(e).__name__}: {e}"}
+            if isinstance(e, BudgetExceeded):
+                write_json(job_dir / "application_state.json", {"usage": usage.report()}, indent=2)
+
+    status.update({
+        "resume": str(job["resume"]),
+        "job_desc": str(job["job_desc"]),
+        "started_at": started_at,
+        "finished_at": time.time(),
+    })
+    write_json(job_dir / STATUS_FILE, status, indent=2)
+    return job["id"], status["status"]
+
+
+async def run_batch(jobs, out_dir: Path, concurrency: int):
+    semaphore = asyncio.Semaphore(concurrency)
+    return await asyncio.gather(*(run_job(job, out_dir, semaphore) for job in jobs))
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Run the JobApplicationCrew for every resume/job description pair of a manifest."
+    )
+    parser.add_argument(
+        "--manifest",
+        type=Path,
+        required=True,
+        help="CSV (header: id,resume,job_desc) or JSONL manifest of the jobs; `id` is optional."
+    )
+    parser.add_argument(
+        "--out_dir",
+        type=Path,
+        default=Path(OUTPUT_DIR),
+        help="Root directory of the per-job output directories (default: batch_output/)."
+    )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=4,
+        help="Maximum number of jobs running at the same time (default: 4)."
+    )
+    args = parser.parse_args()
+
+    if args.concurrency < 1:
+        parser.error("--concurrency must be at least 1")
+    if not args.manifest.exists():
+        logger.error("❌ Manifest `%s` does not exist.", args.manifest)
+        raise FileNotFoundError(f"Manifest `{args.manifest}` does not exist.")
+
+    check_llm_provider()
+    init_tracing()
+
+    out_dir = args.out_dir.expanduser().resolve()
+    out_dir.mkdir(parents=True, exist_ok=True)
+
+    jobs = read_manifest(args.manifest)
+    pending = []
+    for job in jobs:
+        status = read_status(out_dir / job["id"])
+        if status and status["status"] == "done":
+            logger.info("⏭️ Job `%s` skipped, already done.", job["id"])
+            continue
+        pending.append(job)
+
+    logger.info("📋 %d jobs in manifest, %d to run, concurrency %d.", len(jobs), len(pending), args.concurrency)
+    results = asyncio.run(run_batch(pending, out_dir, args.concurrency))
+
+    failed = [job_id for job_id, status in results if status != "done"]
+    logger.info("🏁 Batch finished: %d done, %d failed.", len(results) - len(failed), len(failed))
+    if failed:
+        logger.error("❌ Failed jobs: %s", ", ".join(failed))
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -4,17 +4,18 @@ import os
 import json
 import logging
 import argparse
-from langtrace_python_sdk import langtrace
+from contextlib import nullcontext
 
-from crews.motivation_letter.motivation_letter_crew import MotivationLetterCrew
-
-# Initialize LangTrace
-langtrace.init(api_key=os.getenv("LANGTRACE_API_KEY"))
+# crewai, the crew and langtrace take seconds to import: they are imported once the arguments
+# are parsed and checked, so `--help` and usage errors return immediately
 
 # Default docs directory
 DOC_PATH = "docs"
 DEFAULT_JOB_POSTING_URL = "N/A"
 DEFAULT_JOB_POSTING_FILE = "job_advertise.md"
+DEFAULT_RESUME_FILE = "new_resume.md"
+# JSON line per completed task, written by --stream
+EVENT_LOG_FILE = "events.jsonl"
 
 # Configure root logger
 logging.basicConfig(
@@ -51,6 +52,11 @@ def main():
         default=DOC_PATH,
         help="Directory to write output files"
     )
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="Print the motivation letter as the LLM writes it, and log each task result to <doc_path>/events.jsonl."
+    )
     args = parser.parse_args()
 
     # Convert doc_path to absolute path
@@ -75,25 +81,53 @@ def main():
     llm = os.getenv("LLM_PROVIDER", "").upper()
     logger.info("🧠 GenAI provider in use: %s", llm or "not set")
 
+    # Initialize LangTrace
+    from langtrace_python_sdk import langtrace
+    langtrace.init(api_key=os.getenv("LANGTRACE_API_KEY"))
+
+    from crews.llm import get_llm_client
+    from crews.motivation_letter.motivation_letter_crew import MotivationLetterCrew, model_name
+    from crews.streaming import FinalTaskStream, TaskEventLog
+    from crews.usage import BudgetExceeded, UsageTracker, agent_names
+
+    out_file = os.path.join(doc_path, "application_state.json")
     try:
         # Initialize and run the crew
-        crew = MotivationLetterCrew(doc_path, args.company_url).crew()
-        state = crew.kickoff(
-                inputs={
-                "company_url": args.company_url,
-                "job_posting_url": args.job_posting_url
-            })
-
-        # Write out the application state
-        out_file = os.path.join(doc_path, "application_state.json")
+        motivation = MotivationLetterCrew(doc_path, args.company_url)
+        usage = UsageTracker.from_env(agent_names(motivation))
+        crew = motivation.crew()
+        stream = nullcontext()
+        if args.stream:
+            # tokens of the final task go to stdout and the letter file, task results to the event log
+            get_llm_client(model_name).stream = True
+            crew.task_callback = TaskEventLog(os.path.join(doc_path, EVENT_LOG_FILE))
+            stream = FinalTaskStream(crew.tasks[-1])
+        with usage, stream:
+            state = crew.kickoff(
+                    inputs={
+                    "company_url": args.company_url,
+                    "job_posting_url": args.job_posting_url,
+                    "resume_file": DEFAULT_RESUME_FILE
+                })
+
+        # Write out the application state, with the token and time usage of the run
         with open(out_file, "w") as f:
             json.dump(
-                state.model_dump() if hasattr(state, "model_dump") else dict(state),
+                {
+                    **(state.model_dump() if hasattr(state, "model_dump") else dict(state)),
+                    "usage": usage.report(),
+                },
                 f,
                 indent=2
             )
 
         logger.info("✅ Done. Docs in `%s`.", doc_path)
+    except BudgetExceeded as e:
+        # keep the accounting of the aborted run, it shows where the budget went
+        with open(out_file, "w") as f:
+            json.dump({"usage": usage.report()}, f, indent=2)
+        logger.error("❌ Budget exceeded: %s. Usage written to `%s`.", e, out_file)
+        sys.exit(1)
     except Exception as e:
         logger.exception("💥 An unexpected error occurred:")
         sys.exit(1)
@@ -0,0 +1,9 @@
+import os
+import sys
+from pathlib import Path
+
+# the modules are imported as `tools.*`, like the scripts in src/ do
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+# analyses are computed by the tests, never read back from a persistent analysis cache
+os.environ.pop("ANALYSIS_CACHE_PATH", None)
@@ -0,0 +1,89 @@
+'''
+Checks of the analyzer service and of its client: request validation, and the fallback to local
+scoring when something else answers on the service port.
+'''
+import json
+import threading
+import urllib.error
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from tools.analyzer_service import AnalyzerServer, analyze_remote
+
+
+def running(server):
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return f"127.0.0.1:{server.server_address[1]}"
+
+
+@pytest.fixture(scope="module")
+def service():
+    server = AnalyzerServer(("127.0.0.1", 0), pool_size=1)
+    address = running(server)
+    yield address
+    server.shutdown()
+    server.server_close()
+
+
+def post(address, body):
+    request = urllib.request.Request(f"http://{address}/analyze", data=body,
+                                     headers={"Content-Type": "application/json"})
+    try:
+        with urllib.request.urlopen(request, timeout=30) as response:
+            return response.status, json.loads(response.read())
+    except urllib.error.HTTPError as e:
+        return e.code, json.loads(e.read())
+
+
+def test_service_scores_like_the_tool(service):
+    result = json.loads(analyze_remote("Python and Kafka engineer.", "Python engineer wanted.",
+                                       output_format="json", address=service))
+    assert result["keywords_match"] == 100.0
+
+
+@pytest.mark.parametrize("body, error", [
+    (b"[1, 2]", "must be a JSON object"),
+    (b"not json", "Expecting value"),
+    (json.dumps({"resume": "Python developer."}).encode(), "must be strings"),
+    (json.dumps({"resume": "Python developer.", "job_description": " \n"}).encode(), "`job_description` is empty"),
+    (json.dumps({"resume": "Python developer.", "job_description": "and the of"}).encode(), "no keywords"),
+])
+def test_invalid_requests_are_rejected(service, body, error):
+    status, payload = post(service, body)
+    assert status == 400
+    assert error in payload["error"]
+
+
+def test_service_errors_are_raised(service):
+    with pytest.raises(RuntimeError, match="400"):
+        analyze_remote("Python developer.", "", address=service)
+
+
+class OtherServerHandler(BaseHTTPRequestHandler):
+    # a dev server or a proxy listening on the service port
+    status = 500
+
+    def do_POST(self):
+        body = b"<html>Internal Server Error</html>"
+        self.send_response(self.status)
+        self.send_header("Content-Type", "text/html")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.mark.parametrize("status", [200, 404, 500, 502])
+def test_client_falls_back_when_another_server_answers(status):
+    handler = type("Handler", (OtherServerHandler,), {"status": status})
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    try:
+        assert analyze_remote("Python developer.", "Python developer wanted.", address=running(server)) is None
+    finally:
+        server.shutdown()
+        server.server_close()
@@ -0,0 +1,62 @@
+'''
+Checks of the batch scoring: every pair scores as a single KeywordsAnalyzerTool analysis does.
+'''
+from pathlib import Path
+
+import pytest
+
+from tools.batch_scoring import score_batch
+from tools.ingest import document_text
+from tools.keywords_analyzer_tool import KeywordsAnalyzerTool
+
+DOCS = Path(__file__).resolve().parent.parent / "docs"
+
+
+@pytest.fixture(scope="module")
+def documents():
+    resume = document_text(DOCS / "fake_resume.md")
+    job_description = document_text(DOCS / "job_adverise.md")
+    paragraphs = job_description.split("\n\n")
+    resumes = {
+        "full.md": resume,
+        "short.md": resume[:len(resume) // 3],
+        "devops.md": "Platform engineer: Kubernetes, Terraform and Python on Google Cloud Platform.",
+    }
+    job_descriptions = {
+        "full.md": job_description,
+        "head.md": "\n\n".join(paragraphs[:len(paragraphs) // 2]),
+        "tail.md": "\n\n".join(paragraphs[len(paragraphs) // 2:]),
+    }
+    return resumes, job_descriptions
+
+
+def test_batch_scores_and_ranking_match_single_analyses(documents):
+    resumes, job_descriptions = documents
+    results = score_batch(resumes, job_descriptions)
+    assert len(results) == len(resumes) * len(job_descriptions)
+
+    expected = []
+    for jd_name, job_description in job_descriptions.items():
+        for resume_name, resume in resumes.items():
+            analysis = KeywordsAnalyzerTool().analyze(resume, job_description)
+            expected.append({
+                'resume': resume_name,
+                'job_description': jd_name,
+                'keywords_match': analysis['keywords_match'],
+                'cosine_similarity': analysis['cosine_similarity'],
+                'matched_keywords': len(analysis['matched_keywords']),
+                'jd_keywords': analysis['jd_keywords'],
+                'missing_keywords': analysis['missing_keywords'],
+                'phrases_match': analysis['phrases_match'],
+                'missing_phrases': analysis['missing_phrases'],
+            })
+    expected.sort(key=lambda x: (x['keywords_match'], x['cosine_similarity']), reverse=True)
+    assert results == expected
+
+
+def test_batch_without_any_keyword_scores_zero():
+    results = score_batch({"empty.md": "", "blank.md": "\n\n"}, {"empty.md": "", "symbols.md": "- * !"})
+
+    assert len(results) == 4
+    assert all(r['keywords_match'] == r['cosine_similarity'] == r['phrases_match'] == 0.0 for r in results)
+    assert all(r['jd_keywords'] == 0 and r['missing_keywords'] == [] for r in results)
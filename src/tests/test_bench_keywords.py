@@ -0,0 +1,33 @@
+'''
+Checks of the regression check of the keywords benchmark.
+'''
+from benchmarks.bench_keywords import compare
+
+BASELINE = {"results": [
+    {"stage": "spacy_keywords", "size": 1000, "median_s": 0.010},
+    {"stage": "nltk_keywords", "size": 1000, "median_s": 0.010},
+    {"stage": "cosine", "size": 1000, "error": "LookupError: punkt"},
+]}
+
+
+def test_slower_and_failing_stages_are_regressions():
+    report = {"results": [
+        {"stage": "spacy_keywords", "size": 1000, "median_s": 0.020},
+        {"stage": "nltk_keywords", "size": 1000, "error": "LookupError: punkt_tab"},
+        {"stage": "cosine", "size": 1000, "error": "LookupError: punkt"},
+        {"stage": "matching", "size": 1000, "error": "ValueError"},
+    ]}
+
+    regressions = compare(report, BASELINE, tolerance=0.25)
+    assert len(regressions) == 2
+    assert regressions[0].startswith("spacy_keywords @ 1000 B: 20.00 ms")
+    assert regressions[1].startswith("nltk_keywords @ 1000 B: failed (LookupError: punkt_tab)")
+
+
+def test_stages_within_the_tolerance_pass():
+    report = {"results": [
+        {"stage": "spacy_keywords", "size": 1000, "median_s": 0.012},
+        {"stage": "nltk_keywords", "size": 1000, "median_s": 0.008},
+    ]}
+
+    assert compare(report, BASELINE, tolerance=0.25) == []
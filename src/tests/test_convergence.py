@@ -0,0 +1,87 @@
+'''
+Checks of the convergence controller with a stub crew, and of the gen_application flags.
+'''
+import subprocess
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+from crews.job_application.convergence import ConvergenceController, estimate_revision_tokens
+from tools.keywords_analyzer_tool import KeywordsAnalyzerTool
+
+SRC = Path(__file__).resolve().parent.parent
+JOB_DESCRIPTION = "Python engineer building Kafka pipelines on Kubernetes with Terraform and Postgres."
+
+
+class StubCrew:
+    # the crew interface the controller uses; every revision appends the next keyword to the draft
+    def __init__(self, tmp_path, additions, tokens=1_000):
+        self.resume_path = tmp_path / "resume.md"
+        self.job_desc_path = tmp_path / "job.md"
+        self.resume_path.write_text("Engineer.", encoding="utf-8")
+        self.job_desc_path.write_text(JOB_DESCRIPTION, encoding="utf-8")
+        self.keyword_analyzer = KeywordsAnalyzerTool()
+        self.revisions = []
+        self._additions = list(additions)
+        self._tokens = tokens
+
+    def document_inputs(self):
+        return {"resume": self.resume_path.read_text(), "job_desc": JOB_DESCRIPTION}
+
+    def revision_crew(self):
+        return self
+
+    def kickoff(self, inputs):
+        self.revisions.append(inputs)
+        draft = f"{inputs['previous_resume']} {self._additions.pop(0)}"
+        return SimpleNamespace(raw=draft, token_usage=SimpleNamespace(total_tokens=self._tokens))
+
+
+def test_revisions_run_until_the_threshold(tmp_path):
+    crew = StubCrew(tmp_path, ["Python Kafka Kubernetes", "Terraform Postgres pipelines"])
+    result = ConvergenceController(crew, threshold=70, max_iterations=5).run()
+
+    assert result["stop_reason"] == "threshold"
+    assert result["scores"]["keywords_match"] == 100.0
+    assert result["iterations"] == len(crew.revisions) == 2
+    assert result["total_tokens"] == 2_000
+
+
+def test_token_budget_is_checked_before_the_first_revision(tmp_path):
+    crew = StubCrew(tmp_path, ["Python"])
+    controller = ConvergenceController(crew, threshold=100, token_budget=1)
+    result = controller.run()
+
+    assert result["stop_reason"] == "token_budget"
+    assert crew.revisions == []
+    assert result["iterations"] == result["total_tokens"] == 0
+
+
+def test_token_budget_uses_the_previous_revision(tmp_path):
+    crew = StubCrew(tmp_path, ["Python", "Kafka", "Kubernetes"], tokens=600)
+    result = ConvergenceController(crew, threshold=100, token_budget=1_000).run()
+
+    # the second revision would take the run to 1200 tokens
+    assert result["stop_reason"] == "token_budget"
+    assert len(crew.revisions) == 1
+    assert estimate_revision_tokens(crew.revisions[0]) < 1_000
+
+
+@pytest.mark.parametrize("flags, message", [
+    (["--top_k", "0"], "--top_k must be at least 1"),
+    (["--top_k", "-3"], "--top_k must be at least 1"),
+    (["--max_iterations", "0"], "--max_iterations must be at least 1"),
+    (["--token_budget", "0"], "--token_budget must be positive"),
+    (["--threshold", "0"], "--threshold must be above 0 and at most 100"),
+    (["--threshold", "120"], "--threshold must be above 0 and at most 100"),
+])
+def test_gen_application_rejects_invalid_convergence_flags(flags, message):
+    result = subprocess.run(
+        [sys.executable, "gen_application.py", "--resume", "missing.md", "--job_desc", "missing.md",
+         "--converge", *flags],
+        cwd=SRC, capture_output=True, text=True,
+    )
+    assert result.returncode == 2
+    assert message in result.stderr
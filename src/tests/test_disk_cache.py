@@ -0,0 +1,54 @@
+'''
+Checks of the running total of the disk cache: replaced, deleted and evicted entries, and cache
+files written before the total was kept.
+'''
+import json
+import sqlite3
+
+from tools.disk_cache import DiskCache
+
+
+def stored_size(cache):
+    with sqlite3.connect(cache.path) as conn:
+        return conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+
+
+def test_total_follows_replaced_and_deleted_entries(tmp_path):
+    cache = DiskCache(tmp_path / "cache.sqlite")
+    cache.set("ns", "a", "x" * 100)
+    cache.set("ns", "b", "y" * 50)
+    cache.set("ns", "a", "z" * 10)
+    cache.delete("ns", "b")
+
+    assert cache.get("ns", "a") == "z" * 10
+    assert cache.total_size() == stored_size(cache) == len(json.dumps("z" * 10))
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path):
+    cache = DiskCache(tmp_path / "cache.sqlite", max_bytes=350)
+    for key in "abc":
+        cache.set("ns", key, "x" * 98)
+    # a is read after b was written, b is now the least recently used entry
+    cache.get("ns", "a")
+    cache.set("ns", "d", "x" * 98)
+
+    assert cache.get("ns", "b") is None
+    assert cache.get("ns", "a") is not None
+    assert cache.total_size() == stored_size(cache) <= 350
+
+
+def test_total_is_seeded_from_an_older_cache_file(tmp_path):
+    path = tmp_path / "cache.sqlite"
+    with sqlite3.connect(path) as conn:
+        conn.execute(
+            "CREATE TABLE entries (namespace TEXT NOT NULL, key TEXT NOT NULL, value TEXT NOT NULL,"
+            " size INTEGER NOT NULL, created_at REAL NOT NULL, accessed_at REAL NOT NULL,"
+            " PRIMARY KEY (namespace, key))"
+        )
+        conn.execute("INSERT INTO entries VALUES ('ns', 'a', '\"old\"', 5, 0, 0)")
+
+    cache = DiskCache(path)
+    cache.set("ns", "b", "new")
+
+    assert cache.get("ns", "a") == "old"
+    assert cache.total_size() == stored_size(cache) == 10
@@ -0,0 +1,82 @@
+'''
+Offline checks of the persistent embedding store, with the local hashing embedder.
+'''
+import pytest
+
+from tools import embedding_store
+from tools.embedding_store import PersistentMDXSearchTool
+
+
+@pytest.fixture
+def workdir(tmp_path, monkeypatch):
+    # crewai_tools only reads files below the working directory
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("EMBEDDING_PROVIDER", "hashing")
+    monkeypatch.setenv("EMBEDDING_STORE_PATH", str(tmp_path / "store"))
+    return tmp_path
+
+
+def write(path, text):
+    path.write_text(text, encoding="utf-8")
+    return str(path.name)
+
+
+def test_search_returns_the_indexed_document(workdir):
+    resume = write(workdir / "resume.md", "# Experience\n\nKubernetes and Terraform platform engineer in Dublin.\n")
+    tool = PersistentMDXSearchTool()
+    tool.add(resume)
+
+    result = tool._run("Kubernetes engineer")
+    assert "Kubernetes and Terraform" in result
+    assert "No relevant content found." not in result
+
+
+def test_search_is_limited_to_the_named_document(workdir):
+    resume = write(workdir / "resume.md", "Resume of a Kubernetes platform engineer.\n")
+    job = write(workdir / "job.md", "We are hiring a Kubernetes platform engineer.\n")
+    tool = PersistentMDXSearchTool()
+    tool.add(resume)
+    tool.add(job)
+
+    result = tool._run("Kubernetes platform engineer", mdx=job)
+    assert "We are hiring" in result
+    assert "Resume of" not in result
+
+
+def test_unchanged_document_is_not_embedded_again(workdir, monkeypatch):
+    resume = write(workdir / "resume.md", "Python and Kafka data engineer.\n")
+    PersistentMDXSearchTool().add(resume)
+
+    added = []
+    monkeypatch.setattr(embedding_store.RagTool, "add", lambda self, *a, **k: added.append(a))
+    tool = PersistentMDXSearchTool()
+    tool.add(resume)
+    assert added == []
+    assert "Kafka" in tool._run("Kafka engineer")
+
+
+def test_search_without_documents_does_not_return_other_applications(workdir):
+    other = write(workdir / "other.md", "Resume of another Kubernetes platform engineer.\n")
+    PersistentMDXSearchTool().add(other)
+
+    result = PersistentMDXSearchTool()._run("Kubernetes platform engineer")
+    assert "another" not in result
+    assert "No relevant content found." in result
+
+
+def test_search_on_an_empty_store(workdir):
+    tool = PersistentMDXSearchTool()
+    assert tool.search("Kubernetes", ["0" * 64]) == []
+    assert not tool.embedded("0" * 64)
+
+
+def test_document_embedded_by_another_run_is_not_embedded_again(workdir):
+    resume = write(workdir / "resume.md", "Go and Postgres backend engineer.\n")
+    first, second = PersistentMDXSearchTool(), PersistentMDXSearchTool()
+    first.add(resume)
+    # the second tool finds the chunks in the store, then a concurrent re-embedding upserts the same ids
+    second.add(resume)
+    embedding_store.RagTool.add(second, resume, data_type=embedding_store.DataType.MDX,
+                                metadata={"content_hash": embedding_store.file_hash(resume)})
+
+    assert len(second.collection().get(include=[])["ids"]) == 1
@@ -0,0 +1,37 @@
+'''
+Checks of the job postings index: queries, and indexes built with another pipeline.
+'''
+import json
+
+import pytest
+
+from tools.job_index import INDEX_META, JobIndex, build_index
+
+
+@pytest.fixture
+def index_dir(tmp_path):
+    postings = tmp_path / "postings"
+    postings.mkdir()
+    (postings / "data.md").write_text("Data engineer: Python, Kafka and Postgres pipelines.", encoding="utf-8")
+    (postings / "web.md").write_text("Frontend developer: React and TypeScript interfaces.", encoding="utf-8")
+    (postings / "ops.md").write_text("Platform engineer: Kubernetes and Terraform.", encoding="utf-8")
+    assert build_index(postings, tmp_path / "index") == 3
+    return tmp_path / "index"
+
+
+def test_query_ranks_the_postings_sharing_keywords(index_dir):
+    results = JobIndex(index_dir).query("Python developer building Kafka pipelines.", top_k=2)
+
+    assert [r["job_description"] for r in results] == ["data.md"]
+    assert "postgres" in results[0]["missing_keywords"]
+
+
+@pytest.mark.parametrize("name", ["pipeline", "sklearn"])
+def test_index_built_with_other_versions_is_refused(index_dir, name):
+    meta_path = index_dir / INDEX_META
+    meta = json.loads(meta_path.read_text(encoding="utf-8"))
+    meta[name] = "other"
+    meta_path.write_text(json.dumps(meta), encoding="utf-8")
+
+    with pytest.raises(RuntimeError, match=f"{name} other .*rebuild"):
+        JobIndex(index_dir)
@@ -0,0 +1,109 @@
+'''
+Checks of the job description keyphrases: the phrase automaton, the noun runs of a tagged text,
+the frequency filter and the missing phrases budget of the reports.
+'''
+from spacy.tokens import Doc
+
+from tools import keywords_analyzer_tool as kat
+from tools.phrase_matcher import PhraseMatcher, phrase_tokens
+
+
+def tagged_doc(tagged):
+    # (word, tag, followed by a space) triples, tagged by hand so the test doesn't depend on the model
+    words, tags, spaces = zip(*tagged)
+    return Doc(kat.load_spacy().vocab, words=list(words), tags=list(tags), spaces=list(spaces))
+
+
+def test_phrase_matcher_counts_overlapping_phrases():
+    matcher = PhraseMatcher(["google cloud", "Google Cloud Platform", "cloud platform", "google cloud"])
+
+    assert matcher.phrases == ["google cloud", "google cloud platform", "cloud platform"]
+    counts = matcher.find("Google Cloud Platform on google cloud, not Cloud-Platform.")
+    assert counts == {"google cloud": 2, "google cloud platform": 1, "cloud platform": 1}
+
+
+def test_phrase_matcher_accepts_tokens():
+    matcher = PhraseMatcher(["ci/cd pipelines"])
+    text = "Built CI/CD pipelines."
+
+    assert matcher.phrases == ["ci cd pipelines"]
+    assert matcher.find(phrase_tokens(text)) == matcher.find(text) == {"ci cd pipelines": 1}
+
+
+def test_keyphrases_are_noun_runs_without_trailing_adjectives():
+    doc = tagged_doc([
+        ("Strong", "JJ", True), ("machine", "NN", True), ("learning", "NN", True), ("skills", "NNS", True),
+        ("on", "IN", True), ("the", "DT", True), ("Google", "NNP", True), ("Cloud", "NNP", True),
+        ("Platform", "NNP", True), ("and", "CC", True), ("teams", "NNS", True), ("remote", "JJ", False),
+        (".", ".", False),
+    ])
+
+    assert kat.spacy_doc_keyphrases(doc) == ["strong machine learning skills", "google cloud platform"]
+
+
+def test_keyphrases_skip_single_words_long_runs_and_numbers():
+    doc = tagged_doc([
+        ("Python", "NNP", True), ("is", "VBZ", True), ("a", "DT", True),
+        ("cloud", "NN", True), ("data", "NNS", True), ("platform", "NN", True), ("team", "NN", True),
+        ("lead", "NN", True), ("with", "IN", True), ("5", "CD", True), ("years", "NNS", False),
+    ])
+
+    assert kat.spacy_doc_keyphrases(doc) == []
+    assert kat.spacy_doc_keyphrases(doc, max_words=5) == ["cloud data platform team lead"]
+
+
+def test_keyphrases_do_not_start_or_end_inside_a_word():
+    doc = tagged_doc([
+        ("e", "NN", False), ("-", "HYPH", False), ("commerce", "NN", True), ("platform", "NN", True),
+        ("and", "CC", True), ("data", "NNS", True), ("pipelines", "NNS", False), ("'", "POS", False),
+    ])
+
+    assert kat.spacy_doc_keyphrases(doc) == []
+
+
+def test_frequent_keyphrases_drop_one_off_runs():
+    text = ("Machine learning engineers build machine learning pipelines. Our engineers review data "
+            "pipelines. Employees are protected against theft loss.")
+    phrases = ["machine learning", "data pipelines", "theft loss", "learning engineers"]
+
+    # "machine learning" repeats, and so do both words of "learning engineers"; "data" of "data
+    # pipelines" and both words of "theft loss" occur once
+    assert kat.frequent_keyphrases(text, phrases) == ["machine learning", "learning engineers"]
+    assert kat.frequent_keyphrases(text, phrases, min_count=1) == phrases
+
+
+def analysis(missing_keywords, missing_phrases):
+    return {
+        'keywords_match': 50.0, 'cosine_similarity': 50.0, 'phrases_match': 0.0,
+        'matched_keywords': [], 'jd_keywords': len(missing_keywords), 'matched_phrases': [],
+        'jd_phrases': len(missing_phrases), 'table': [],
+        'missing_keywords': list(missing_keywords), 'missing_weights': missing_keywords,
+        'missing_phrases': list(missing_phrases), 'missing_phrase_weights': missing_phrases,
+    }
+
+
+def test_compact_result_shares_top_k_between_phrases_and_keywords():
+    result = kat.compact_result(analysis({"python": 1, "kafka": 5, "sql": 3, "go": 2},
+                                         {"data pipelines": 1, "machine learning": 3, "cloud platform": 2}), top_k=4)
+
+    assert result['missing_phrases'] == ["machine learning", "cloud platform"]
+    assert result['missing_keywords'] == ["kafka", "sql"]
+    assert result['missing_total'] == 4
+
+
+def test_compact_result_gives_the_budget_left_by_phrases_to_keywords():
+    result = kat.compact_result(analysis({"python": 1, "kafka": 5, "sql": 3}, {"machine learning": 3}), top_k=3)
+
+    assert result['missing_phrases'] == ["machine learning"]
+    assert result['missing_keywords'] == ["kafka", "sql"]
+    assert kat.compact_result(analysis({"python": 1}, {"machine learning": 3}), top_k=1)['missing_phrases'] == []
+
+
+def test_table_report_caps_the_missing_phrases():
+    phrases = {f"phrase {n}": n for n in range(kat.TABLE_MISSING_PHRASES + 5)}
+    report = kat.table_report(analysis({}, phrases))
+
+    line = next(line for line in report.splitlines() if line.startswith("Missing key phrases:"))
+    assert line.endswith("(+5 more)")
+    assert line.count(",") == kat.TABLE_MISSING_PHRASES - 1
+    assert "phrase 14" in line and "phrase 0," not in line
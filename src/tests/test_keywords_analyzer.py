@@ -0,0 +1,185 @@
+'''
+Checks of the keywords analyzer pipeline against the sample resume and job description.
+'''
+import json
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from tools import keywords_analyzer_tool as kat
+from tools.ingest import document_text
+
+DOCS = Path(__file__).resolve().parent.parent / "docs"
+
+
+@pytest.fixture(scope="module")
+def resume():
+    return document_text(DOCS / "fake_resume.md")
+
+
+@pytest.fixture(scope="module")
+def job_description():
+    return document_text(DOCS / "job_adverise.md")
+
+
+def string_keywords(text):
+    # the keywords pipeline on Token strings, as it ran before keywords became hash arrays
+    tokens = kat.spacy_tokenizer(kat.clean_text(text))
+    keywords = kat.filter_token_tag(kat.spacy_pos_tag(tokens), 'NNP')
+    return kat.unique_tokens(kat.spacy_stopwords_removal(keywords))
+
+
+@pytest.mark.parametrize("document", ["resume", "job_description"])
+def test_hash_keywords_match_the_string_pipeline(document, request):
+    text = request.getfixturevalue(document)
+    expected = string_keywords(text)
+
+    doc = kat.spacy_tokenizer(kat.clean_text(text))
+    assert kat.spacy_doc_keyword_hashes(doc).tolist() == kat.keyword_hashes(expected).tolist()
+    assert kat.spacy_doc_keywords(doc) == expected
+    assert kat._spacy_keywords(text) == expected
+    assert kat.spacy_keywords_batch([text, text]) == [expected, expected]
+
+
+def test_keyword_hashes_are_spacy_string_hashes():
+    strings = kat.load_spacy().vocab.strings
+    hashes = kat.keyword_hashes(["python", "kubernetes"])
+
+    assert hashes.dtype == np.uint64
+    assert hashes.tolist() == [strings.add("python"), strings.add("kubernetes")]
+    assert kat.keyword_hashes([]).tolist() == []
+
+
+def paragraph_keywords(text):
+    # keywords of a revision analysed from scratch, paragraph by paragraph
+    return set(kat.ParagraphKeywordCache().keyword_hashes(text).tolist())
+
+
+def test_paragraph_cache_follows_added_edited_and_removed_paragraphs(resume, monkeypatch):
+    cache = kat.ParagraphKeywordCache()
+    tagged = []
+    tag = cache._tag
+    monkeypatch.setattr(cache, "_tag", lambda paragraphs: tagged.extend(paragraphs) or tag(paragraphs))
+
+    paragraphs = [paragraph.strip() for paragraph in kat.split_paragraphs(resume)]
+    added = "Kubernetes operator written in Golang for the billing platform."
+    edited = paragraphs[1].replace(paragraphs[1].split()[-1], "Terraform")
+    revisions = [
+        paragraphs,
+        paragraphs + [added],                                     # a paragraph added
+        [paragraphs[0], edited] + paragraphs[2:] + [added],       # a paragraph edited
+        [paragraphs[0], edited] + paragraphs[3:] + [added],       # a paragraph removed
+        [paragraphs[0], edited] + paragraphs[3:] + [added, added],  # a paragraph repeated
+        paragraphs,                                               # back to the first revision
+    ]
+    # the paragraph edited back is still in the LRU of paragraph keywords
+    new_paragraphs = [len(set(paragraphs)), 1, 1, 0, 0, 0]
+
+    for revision, new in zip(revisions, new_paragraphs):
+        text = "\n\n".join(revision)
+        tagged.clear()
+        assert set(cache.keyword_hashes(text).tolist()) == paragraph_keywords(text)
+        assert len(tagged) == new
+
+
+def test_paragraph_cache_forgets_least_recently_used_paragraphs():
+    cache = kat.ParagraphKeywordCache(max_paragraphs=2)
+    first, second, third = "Python developer.", "Kafka streams.", "Postgres tuning."
+    cache.keyword_hashes(f"{first}\n\n{second}\n\n{third}")
+
+    assert len(cache._paragraphs) == 2
+    # the paragraphs of the last revision are still served from it
+    assert set(cache.keyword_hashes(first).tolist()) == paragraph_keywords(first)
+
+
+@pytest.mark.parametrize("max_chars", [1, 7, 80, 500, 10_000])
+def test_split_chunks_round_trip_within_max_chars(job_description, max_chars):
+    chunks = kat.split_chunks(job_description, max_chars)
+
+    assert "".join(chunks) == job_description
+    assert all(0 < len(chunk) <= max_chars for chunk in chunks)
+
+
+def test_split_chunks_prefer_paragraph_then_sentence_boundaries():
+    text = "First sentence. Second sentence.\n\nThird paragraph here."
+
+    assert kat.split_chunks(text, 40) == ["First sentence. Second sentence.\n\n", "Third paragraph here."]
+    assert kat.split_chunks(text, 21) == ["First sentence. ", "Second sentence.\n\n", "Third paragraph here."]
+    assert kat.split_chunks("abcdefghij", 4) == ["abcd", "efgh", "ij"]
+    assert kat.split_chunks(text) == [text]
+
+
+def test_chunked_keywords_do_not_depend_on_the_number_of_processes(job_description):
+    max_chars = 2_000
+    chunks = kat.split_chunks(job_description, max_chars)
+    assert len(chunks) > 2
+    # the chunks' keywords, merged in text order
+    expected = list(dict.fromkeys(keyword for chunk in chunks for keyword in kat._spacy_keywords(chunk)))
+
+    for n_process in (1, 2):
+        assert kat.spacy_chunked_keywords(job_description, max_chars, processes=n_process) == expected
+    # chunked and whole documents share one pipe, results stay in input order
+    short = "Python and Kafka engineer."
+    results = kat.spacy_pipe_analysis([short, job_description, short], n_process=2, max_chars=max_chars)
+    assert [keywords for keywords, _ in results] == [kat._spacy_keywords(short), expected, kat._spacy_keywords(short)]
+
+
+def test_compact_result_keeps_the_top_k_heaviest_missing_items(resume, job_description):
+    analysis = kat.KeywordsAnalyzerTool().analyze(resume, job_description)
+    full = kat.compact_result(analysis)
+    assert full['missing_keywords'] == analysis['missing_keywords']
+    assert full['missing_phrases'] == analysis['missing_phrases']
+
+    weights = analysis['missing_weights']
+    for top_k in (1, 5, 20):
+        result = kat.compact_result(analysis, top_k)
+        kept = result['missing_keywords']
+        assert len(kept) + len(result['missing_phrases']) == top_k
+        assert [weights[word] for word in kept] == sorted((weights[word] for word in kept), reverse=True)
+        assert min(weights[word] for word in kept) >= max(weights[word] for word in set(weights) - set(kept))
+        assert result['missing_total'] == len(analysis['missing_keywords'])
+        assert result['keywords_match'] == analysis['keywords_match']
+
+
+def test_json_output_is_the_compact_result(resume, job_description):
+    tool = kat.KeywordsAnalyzerTool()
+    result = json.loads(tool._run(resume, job_description, output_format="json", top_k=6))
+
+    assert result == kat.compact_result(tool.analyze(resume, job_description), 6)
+    with pytest.raises(ValueError):
+        tool._run(resume, job_description, output_format="xml")
+
+
+def test_job_description_profile_is_built_once_per_job_description(resume, job_description, monkeypatch):
+    expected = kat.KeywordsAnalyzerTool().analyze(resume, job_description)
+    built = []
+    profile = kat.job_description_profile
+    monkeypatch.setattr(kat, "job_description_profile", lambda text: built.append(text) or profile(text))
+    tool = kat.KeywordsAnalyzerTool(jd_cache_size=2)
+
+    assert tool.analyze(resume, job_description) == expected
+    assert tool.analyze(resume + "\n\nKubernetes.", job_description)['jd_keywords'] == expected['jd_keywords']
+    assert len(built) == 1
+
+    # least recently used job descriptions are dropped past jd_cache_size
+    tool.analyze(resume, "Python developer.")
+    tool.analyze(resume, job_description)
+    tool.analyze(resume, "Kafka engineer.")
+    tool.analyze(resume, job_description)
+    assert built == [job_description, "Python developer.", "Kafka engineer."]
+    tool.analyze(resume, "Python developer.")
+    assert built[-1] == "Python developer."
+    assert len(tool._jd_profiles) == 2
+
+
+def test_lean_pipeline_is_loaded_once_and_tags_like_the_full_one(job_description):
+    lean = kat.load_spacy()
+    assert kat.load_spacy() is lean
+    excluded = {name.strip() for name in kat.SPACY_EXCLUDE.split(",")}
+    assert not excluded & set(lean.pipe_names)
+
+    full = kat.load_spacy(exclude="")
+    assert kat.spacy_doc_keywords(full(kat.clean_text(job_description))) == kat._spacy_keywords(job_description)
+    # cached analyses of one pipeline are never served to the other
+    assert kat.spacy_pipeline_version(exclude="") != kat.spacy_pipeline_version()
@@ -0,0 +1,127 @@
+'''
+Checks of the web cache against a local HTTP server: TTL hits, ETag and Last-Modified
+revalidation, no-store pages and failed refetches.
+'''
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+import requests
+
+from tools.disk_cache import DiskCache
+from tools.web_cache import WebCache
+
+ETAG = '"v1"'
+LAST_MODIFIED = "Mon, 05 Oct 2026 10:00:00 GMT"
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    # path -> number of requests, and the response mode of the flaky page
+    hits = {}
+    flaky_status = 200
+
+    def do_GET(self):
+        StubHandler.hits[self.path] = StubHandler.hits.get(self.path, 0) + 1
+        headers = {}
+        if self.path == "/etag":
+            if self.headers.get("If-None-Match") == ETAG:
+                return self._send(304, b"")
+            headers["ETag"] = ETAG
+        elif self.path == "/last-modified":
+            if self.headers.get("If-Modified-Since") == LAST_MODIFIED:
+                return self._send(304, b"")
+            headers["Last-Modified"] = LAST_MODIFIED
+        elif self.path == "/no-store":
+            headers["Cache-Control"] = "no-store"
+        elif self.path == "/flaky" and StubHandler.flaky_status != 200:
+            return self._send(StubHandler.flaky_status, b"server error")
+        self._send(200, f"page {self.path} #{StubHandler.hits[self.path]}".encode(), headers)
+
+    def _send(self, status, body, headers=None):
+        self.send_response(status)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server(monkeypatch):
+    # safe_get refuses private addresses such as 127.0.0.1 unless this is set
+    monkeypatch.setenv("CREWAI_TOOLS_ALLOW_UNSAFE_PATHS", "true")
+    StubHandler.hits = {}
+    StubHandler.flaky_status = 200
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{httpd.server_address[1]}"
+    httpd.shutdown()
+    httpd.server_close()
+
+
+@pytest.fixture
+def disk(tmp_path):
+    return DiskCache(tmp_path / "web.sqlite")
+
+
+def test_fresh_page_is_served_from_the_cache(server, disk):
+    cache = WebCache(disk, ttl=3600)
+    first = cache.fetch(f"{server}/page")
+    assert cache.fetch(f"{server}/page") == first
+    assert StubHandler.hits["/page"] == 1
+
+
+def test_concurrent_requests_share_one_fetch(server, disk):
+    cache = WebCache(disk, ttl=3600)
+    threads = [threading.Thread(target=cache.fetch, args=(f"{server}/page",)) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert StubHandler.hits["/page"] == 1
+
+
+@pytest.mark.parametrize("path", ["/etag", "/last-modified"])
+def test_stale_page_is_revalidated(server, disk, path):
+    cache = WebCache(disk, ttl=0)
+    first = cache.fetch(f"{server}{path}")
+    # the server answers 304, the stored copy is served
+    assert cache.fetch(f"{server}{path}") == first
+    assert StubHandler.hits[path] == 2
+
+
+def test_stale_page_without_validators_is_fetched_again(server, disk):
+    cache = WebCache(disk, ttl=0)
+    assert cache.fetch(f"{server}/page") != cache.fetch(f"{server}/page")
+
+
+def test_no_store_page_is_not_cached(server, disk):
+    cache = WebCache(disk, ttl=3600)
+    cache.fetch(f"{server}/no-store")
+    cache.fetch(f"{server}/no-store")
+    assert StubHandler.hits["/no-store"] == 2
+
+
+def test_failed_refetch_serves_the_stale_copy(server, disk):
+    cache = WebCache(disk, ttl=0)
+    first = cache.fetch(f"{server}/flaky")
+    StubHandler.flaky_status = 503
+    assert cache.fetch(f"{server}/flaky") == first
+
+
+def test_unreachable_server_serves_the_stale_copy(server, disk, monkeypatch):
+    cache = WebCache(disk, ttl=0)
+    first = cache.fetch(f"{server}/page")
+
+    def unreachable(*args, **kwargs):
+        raise requests.ConnectionError("connection refused")
+
+    monkeypatch.setattr("tools.web_cache.safe_get", unreachable)
+    assert cache.fetch(f"{server}/page") == first
+    with pytest.raises(requests.ConnectionError):
+        cache.fetch(f"{server}/other")
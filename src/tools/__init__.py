@@ -1 +1,8 @@
-from . import keywords_analyzer_tool
\ No newline at end of file
+import importlib
+
+
+def __getattr__(name):
+    # submodules are imported on first use: a client of the analyzer service must not pay for crewai
+    if name == "keywords_analyzer_tool":
+        return importlib.import_module(f"{__name__}.{name}")
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
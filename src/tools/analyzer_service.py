@@ -0,0 +1,201 @@
+import json
+import logging
+import os
+import queue
+import socket
+import time
+import urllib.error
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+logger = logging.getLogger(__name__)
+
+# Resident scoring service: keeps the spaCy pipeline, the NLTK resources and the analyzer caches
+# warm, so a scoring request costs the analysis only. It listens on localhost; set
+# ANALYZER_SERVICE to host:port to use another address for both the service and its clients.
+DEFAULT_ADDRESS = "127.0.0.1:8765"
+# largest request body accepted, resume and job description included
+MAX_REQUEST_BYTES = 16 * 1024 * 1024
+
+
+def service_address(address=None):
+    '''
+    This function resolves the address of the analyzer service.
+    Input: host:port string, or None for ANALYZER_SERVICE or the default
+    Output: (host, port) tuple
+    '''
+    address = address or os.getenv("ANALYZER_SERVICE", "").strip() or DEFAULT_ADDRESS
+    host, _, port = address.rpartition(":")
+    return host or "127.0.0.1", int(port)
+
+
+# ────────── Server ──────────
+
+class AnalyzerServer(ThreadingHTTPServer):
+    """
+    HTTP server scoring requests concurrently with a pool of KeywordsAnalyzerTool instances.
+    A tool instance serves one request at a time; the pool is last in, first out, so a client
+    re-scoring the same documents (an editor on every save) keeps hitting the warmest instance.
+    """
+    daemon_threads = True
+
+    def __init__(self, address, pool_size=4):
+        from tools.keywords_analyzer_tool import KeywordsAnalyzerTool
+
+        super().__init__(address, AnalyzerRequestHandler)
+        self.pool_size = pool_size
+        self.pool = queue.LifoQueue()
+        for _ in range(pool_size):
+            self.pool.put(KeywordsAnalyzerTool())
+
+    def warm_up(self):
+        '''
+        This function loads the spaCy pipeline and the NLTK resources and runs a first analysis
+        on every tool instance, so the first real request is as fast as the next ones.
+        '''
+        tools = [self.pool.get() for _ in range(self.pool_size)]
+        try:
+            for tool in tools:
+                tool._run(resume="Python developer.", job_description="Python developer wanted.")
+        finally:
+            for tool in reversed(tools):
+                self.pool.put(tool)
+
+    def score(self, request):
+        tool = self.pool.get()
+        try:
+            return tool._run(
+                resume=request["resume"],
+                job_description=request["job_description"],
+                output_format=request.get("output_format", "table"),
+                top_k=request.get("top_k"),
+                include_timings=bool(request.get("include_timings", False)),
+            )
+        finally:
+            self.pool.put(tool)
+
+
+class AnalyzerRequestHandler(BaseHTTPRequestHandler):
+    """
+    POST /analyze   {"resume", "job_description", "output_format", "top_k", "include_timings"}
+                    -> {"result": the KeywordsAnalyzerTool output, "elapsed_ms": server time}
+    GET  /health    -> {"status": "ok", "pool_size": n}
+    """
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        if self.path != "/health":
+            self.send_json(404, {"error": f"unknown path `{self.path}`"})
+            return
+        self.send_json(200, {"status": "ok", "pool_size": self.server.pool_size})
+
+    def do_POST(self):
+        if self.path != "/analyze":
+            self.send_json(404, {"error": f"unknown path `{self.path}`"})
+            return
+        length = int(self.headers.get("Content-Length") or 0)
+        if length > MAX_REQUEST_BYTES:
+            self.send_json(413, {"error": f"request larger than {MAX_REQUEST_BYTES} bytes"})
+            return
+        try:
+            request = json.loads(self.rfile.read(length))
+            if not isinstance(request, dict):
+                raise ValueError("the request body must be a JSON object")
+            if not isinstance(request.get("resume"), str) or not isinstance(request.get("job_description"), str):
+                raise ValueError("`resume` and `job_description` must be strings")
+            if not request["job_description"].strip():
+                raise ValueError("`job_description` is empty")
+        except ValueError as e:
+            self.send_json(400, {"error": str(e)})
+            return
+
+        started = time.perf_counter()
+        try:
+            result = self.server.score(request)
+        except ValueError as e:
+            self.send_json(400, {"error": str(e)})
+            return
+        except Exception as e:
+            logger.exception("💥 Scoring request failed:")
+            self.send_json(500, {"error": f"{type(e).__name__}: {e}"})
+            return
+        self.send_json(200, {"result": result, "elapsed_ms": round((time.perf_counter() - started) * 1000, 3)})
+
+    def send_json(self, status, payload):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        logger.debug("%s - %s", self.address_string(), format % args)
+
+
+def serve(address=None, pool_size=4):
+    '''
+    This function runs the analyzer service until it is interrupted.
+    Input: host:port string (default ANALYZER_SERVICE or 127.0.0.1:8765), number of tool instances
+    '''
+    host, port = service_address(address)
+    server = AnalyzerServer((host, port), pool_size=pool_size)
+    started = time.perf_counter()
+    server.warm_up()
+    logger.info("🔥 Analyzer warmed up in %.1fs, serving %d concurrent requests on http://%s:%d",
+                time.perf_counter() - started, pool_size, host, port)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        logger.info("🛑 Analyzer service stopped.")
+
+
+# ────────── Client ──────────
+
+def analyze_remote(resume, job_description, output_format="table", top_k=None, include_timings=False,
+                   address=None, timeout=30.0):
+    '''
+    This function scores a resume against a job description with the running analyzer service.
+    It only uses the standard library, so a client does not pay for importing the analyzer.
+    Input: Resume text, job description text, KeywordsAnalyzerTool options, service address, timeout
+    Output: KeywordsAnalyzerTool output string, or None when no analyzer service is listening
+    '''
+    host, port = service_address(address)
+    body = json.dumps({
+        "resume": resume,
+        "job_description": job_description,
+        "output_format": output_format,
+        "top_k": top_k,
+        "include_timings": include_timings,
+    }).encode("utf-8")
+    request = urllib.request.Request(f"http://{host}:{port}/analyze", data=body,
+                                     headers={"Content-Type": "application/json"})
+    try:
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            payload = json.loads(response.read())
+            if not isinstance(payload, dict) or "result" not in payload:
+                raise ValueError("no result in the response")
+            return payload["result"]
+    except urllib.error.HTTPError as e:
+        try:
+            payload = json.loads(e.read() or b"{}")
+            if not isinstance(payload, dict):
+                raise ValueError("the error body is not a JSON object")
+        except ValueError:
+            # another server (a dev server, a proxy) answers on the port: score locally
+            logger.debug("No analyzer service on %s:%d (HTTP %d with a non JSON body)", host, port, e.code)
+            return None
+        raise RuntimeError(f"Analyzer service error {e.code}: {payload.get('error', e.reason)}") from None
+    except ValueError:
+        logger.debug("No analyzer service on %s:%d (the response is not the service's JSON)", host, port)
+        return None
+    except urllib.error.URLError as e:
+        if isinstance(e.reason, (ConnectionRefusedError, socket.timeout, FileNotFoundError)):
+            return None
+        raise
+    except (ConnectionRefusedError, socket.timeout, TimeoutError):
+        # refused, or a service that accepted the connection but did not answer in time
+        return None
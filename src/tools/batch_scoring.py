@@ -0,0 +1,132 @@
+from itertools import chain
+from pathlib import Path
+from typing import Dict, List
+
+import numpy as np
+from scipy.sparse import csr_matrix
+from sklearn.feature_extraction.text import CountVectorizer
+from sklearn.metrics.pairwise import cosine_similarity
+
+from tools.ingest import DOCUMENT_SUFFIXES, document_text
+from tools.keywords_analyzer_tool import jd_keyphrases, keyword_hashes, spacy_analysis_batch, split_paragraphs
+from tools.phrase_matcher import compiled_matcher, phrase_tokens
+
+
+def read_documents(directory):
+    '''
+    This function reads every resume or job description in a directory.
+    Input: Directory path
+    Output: Dict mapping file name to text, sorted by file name
+    '''
+    paths = sorted(p for p in Path(directory).iterdir() if p.suffix.lower() in DOCUMENT_SUFFIXES)
+    return {p.name: document_text(p) for p in paths}
+
+
+def _identity(keywords):
+    return keywords
+
+
+def _term_matrix(vectorizer, documents):
+    '''
+    This function fits a CountVectorizer on documents.
+    Input: CountVectorizer, documents
+    Output: CSR document x term matrix, without columns when no document has any term
+    '''
+    try:
+        return vectorizer.fit_transform(documents).tocsr()
+    except ValueError:
+        # CountVectorizer refuses an empty vocabulary: every score of the batch is 0
+        return csr_matrix((len(documents), 0), dtype=np.int64)
+
+
+def score_batch(resumes: Dict[str, str], job_descriptions: Dict[str, str], n_process: int = 1) -> List[dict]:
+    '''
+    This function scores every resume against every job description in one vectorized pass.
+    All documents are tagged once through nlp.pipe, keywords go into one binary sparse matrix
+    and raw terms into one count matrix, so each score is a sparse matrix product.
+    Input: Dicts mapping name to text for resumes and job descriptions, number of spacy processes
+    Output: One result per pair, ranked by keywords match then cosine similarity
+    '''
+    resume_names, jd_names = list(resumes), list(job_descriptions)
+    texts = list(resumes.values()) + list(job_descriptions.values())
+    n_resumes = len(resume_names)
+
+    # resumes are tagged paragraph by paragraph, as KeywordsAnalyzerTool tags them, so a pair
+    # scores the same in a batch and alone
+    resume_paragraphs = [split_paragraphs(text) for text in texts[:n_resumes]]
+    paragraphs = list(chain.from_iterable(resume_paragraphs))
+    n_paragraphs = len(paragraphs)
+
+    # one tagging of every document: the keyphrases of the JDs come from the same Docs
+    paragraph_keywords, jd_phrases = spacy_analysis_batch(
+        paragraphs + texts[n_resumes:], n_process=n_process,
+        keyphrases=range(n_paragraphs, n_paragraphs + len(jd_names)))
+    keywords, start = [], 0
+    for resume in resume_paragraphs:
+        keywords.append(list(dict.fromkeys(chain.from_iterable(paragraph_keywords[start:start + len(resume)]))))
+        start += len(resume)
+    keywords += paragraph_keywords[n_paragraphs:]
+    phrases = {n_resumes + j: jd_phrases[n_paragraphs + j] for j in range(len(jd_names))}
+
+    # binary document x keyword matrix: row products count the shared keywords
+    keyword_vectorizer = CountVectorizer(analyzer=_identity, binary=True)
+    keyword_matrix = _term_matrix(keyword_vectorizer, keywords)
+    resume_keywords, jd_keywords = keyword_matrix[:n_resumes], keyword_matrix[n_resumes:]
+    matched = (jd_keywords @ resume_keywords.T).toarray()
+    jd_keywords_count = jd_keywords.sum(axis=1).A1
+
+    # document x term count matrix, same as KeywordsAnalyzerTool but fitted once for all documents
+    count_matrix = _term_matrix(CountVectorizer(), texts)
+    if count_matrix.shape[1]:
+        cosine = cosine_similarity(count_matrix[n_resumes:], count_matrix[:n_resumes])
+    else:
+        cosine = np.zeros((len(jd_names), n_resumes))
+
+    # keyphrases: every resume is tokenized once and scanned by the compiled automaton of each JD
+    resume_tokens = [phrase_tokens(text) for text in texts[:n_resumes]]
+
+    hashes = [keyword_hashes(k) for k in keywords]
+    results = []
+    for j, jd_name in enumerate(jd_names):
+        total = int(jd_keywords_count[j])
+        phrase_matcher = compiled_matcher(jd_keyphrases(texts[n_resumes + j], phrases[n_resumes + j]))
+        for r, resume_name in enumerate(resume_names):
+            match_percentage = (matched[j, r] / total) * 100 if total else 0.0
+            found = np.isin(hashes[n_resumes + j], hashes[r]).tolist()
+            resume_phrases = phrase_matcher.find(resume_tokens[r])
+            missing_phrases = [p for p in phrase_matcher.phrases if p not in resume_phrases]
+            phrases_match = (1 - len(missing_phrases) / len(phrase_matcher)) * 100 if len(phrase_matcher) else 0.0
+            results.append({
+                'resume': resume_name,
+                'job_description': jd_name,
+                'keywords_match': round(float(match_percentage), 2),
+                'cosine_similarity': round(float(cosine[j, r]) * 100, 2),
+                'matched_keywords': int(matched[j, r]),
+                'jd_keywords': total,
+                'missing_keywords': [w for w, hit in zip(keywords[n_resumes + j], found) if not hit],
+                'phrases_match': round(phrases_match, 2),
+                'missing_phrases': missing_phrases,
+            })
+
+    results.sort(key=lambda x: (x['keywords_match'], x['cosine_similarity']), reverse=True)
+    return results
+
+
+def score_resume_against_jobs(resume: str, job_descriptions: Dict[str, str], n_process: int = 1,
+                              resume_name: str = 'resume') -> List[dict]:
+    '''
+    This function ranks many job descriptions for one resume.
+    Input: Resume text, dict mapping name to job description text, number of spacy processes
+    Output: Ranked results, one per job description
+    '''
+    return score_batch({resume_name: resume}, job_descriptions, n_process=n_process)
+
+
+def score_job_against_resumes(job_description: str, resumes: Dict[str, str], n_process: int = 1,
+                              job_name: str = 'job_description') -> List[dict]:
+    '''
+    This function ranks many resumes for one job description.
+    Input: Job description text, dict mapping name to resume text, number of spacy processes
+    Output: Ranked results, one per resume
+    '''
+    return score_batch(resumes, {job_name: job_description}, n_process=n_process)
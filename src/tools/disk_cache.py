@@ -0,0 +1,159 @@
+import json
+import os
+import sqlite3
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Optional
+
+
+class DiskCache:
+    '''
+    Persistent key/value cache stored in a single SQLite file.
+
+    Values are JSON serialised and grouped by namespace. The total size of the stored values is
+    capped at max_bytes, evicting the least recently used entries first; the total is kept up to
+    date by triggers in a metadata row, so a write doesn't scan the table. Every operation opens
+    its own connection and writes run in IMMEDIATE transactions on a WAL journal, so several
+    threads and worker processes can share the same file.
+    '''
+
+    def __init__(self, path, max_bytes: int = 256 * 1024 * 1024, timeout: float = 30.0):
+        self.path = Path(path).expanduser()
+        self.max_bytes = max_bytes
+        self.timeout = timeout
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS entries ("
+                " namespace TEXT NOT NULL,"
+                " key TEXT NOT NULL,"
+                " value TEXT NOT NULL,"
+                " size INTEGER NOT NULL,"
+                " created_at REAL NOT NULL,"
+                " accessed_at REAL NOT NULL,"
+                " PRIMARY KEY (namespace, key))"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS entries_accessed_at ON entries (accessed_at)")
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                # running total of the value sizes, seeded once from the entries of an older cache file
+                conn.execute("CREATE TABLE IF NOT EXISTS metadata (name TEXT PRIMARY KEY, value INTEGER NOT NULL)")
+                conn.execute(
+                    "INSERT OR IGNORE INTO metadata (name, value)"
+                    " SELECT 'total_size', COALESCE(SUM(size), 0) FROM entries"
+                )
+                conn.execute(
+                    "CREATE TRIGGER IF NOT EXISTS entries_size_insert AFTER INSERT ON entries BEGIN"
+                    " UPDATE metadata SET value = value + NEW.size WHERE name = 'total_size'; END"
+                )
+                conn.execute(
+                    "CREATE TRIGGER IF NOT EXISTS entries_size_update AFTER UPDATE OF size ON entries BEGIN"
+                    " UPDATE metadata SET value = value - OLD.size + NEW.size WHERE name = 'total_size'; END"
+                )
+                conn.execute(
+                    "CREATE TRIGGER IF NOT EXISTS entries_size_delete AFTER DELETE ON entries BEGIN"
+                    " UPDATE metadata SET value = value - OLD.size WHERE name = 'total_size'; END"
+                )
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=self.timeout, isolation_level=None)
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    def get(self, namespace: str, key: str, ttl: Optional[float] = None) -> Optional[Any]:
+        '''
+        Returns the cached value, or None when it is missing or older than ttl seconds.
+        '''
+        now = time.time()
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT value, created_at FROM entries WHERE namespace = ? AND key = ?",
+                (namespace, key),
+            ).fetchone()
+            if row is None:
+                return None
+            value, created_at = row
+            if ttl is not None and now - created_at > ttl:
+                return None
+            conn.execute(
+                "UPDATE entries SET accessed_at = ? WHERE namespace = ? AND key = ?",
+                (now, namespace, key),
+            )
+        return json.loads(value)
+
+    def set(self, namespace: str, key: str, value: Any) -> None:
+        '''
+        Stores a JSON serialisable value, then evicts least recently used entries over max_bytes.
+        '''
+        data = json.dumps(value)
+        size = len(data.encode('utf-8'))
+        if size > self.max_bytes:
+            return
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                # an upsert rather than INSERT OR REPLACE: the implicit delete of a replace doesn't
+                # fire the delete trigger, the total would count the old value too
+                conn.execute(
+                    "INSERT INTO entries (namespace, key, value, size, created_at, accessed_at)"
+                    " VALUES (?, ?, ?, ?, ?, ?)"
+                    " ON CONFLICT (namespace, key) DO UPDATE SET value = excluded.value, size = excluded.size,"
+                    " created_at = excluded.created_at, accessed_at = excluded.accessed_at",
+                    (namespace, key, data, size, now, now),
+                )
+                self._evict(conn)
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+
+    def delete(self, namespace: str, key: str) -> None:
+        with self._connect() as conn:
+            conn.execute("DELETE FROM entries WHERE namespace = ? AND key = ?", (namespace, key))
+
+    def total_size(self) -> int:
+        '''
+        Returns the total size in bytes of the stored values.
+        '''
+        with self._connect() as conn:
+            return self._total_size(conn)
+
+    @staticmethod
+    def _total_size(conn) -> int:
+        return conn.execute("SELECT value FROM metadata WHERE name = 'total_size'").fetchone()[0]
+
+    def _evict(self, conn, batch: int = 64) -> None:
+        excess = self._total_size(conn) - self.max_bytes
+        while excess > 0:
+            # least recently used first, a batch at a time along the accessed_at index
+            rows = conn.execute(
+                "SELECT namespace, key, size FROM entries ORDER BY accessed_at LIMIT ?", (batch,)
+            ).fetchall()
+            if not rows:
+                break
+            for namespace, key, size in rows:
+                if excess <= 0:
+                    break
+                conn.execute("DELETE FROM entries WHERE namespace = ? AND key = ?", (namespace, key))
+                excess -= size
+
+
+def disk_cache_from_env(path_env: str, max_mb_env: str, default_max_mb: int = 256) -> Optional[DiskCache]:
+    '''
+    Builds a DiskCache from environment variables, or returns None when path_env is not set.
+    '''
+    path = os.getenv(path_env, "").strip()
+    if not path:
+        return None
+    max_mb = float(os.getenv(max_mb_env, default_max_mb))
+    return DiskCache(path, max_bytes=int(max_mb * 1024 * 1024))
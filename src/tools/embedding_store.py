@@ -0,0 +1,219 @@
+import hashlib
+import logging
+import os
+import re
+import threading
+from pathlib import Path
+from typing import Any, Optional
+
+import numpy as np
+from chromadb.api.types import EmbeddingFunction
+from crewai.rag.embeddings.factory import build_embedder
+from crewai.rag.embeddings.providers.custom.embedding_callable import CustomEmbeddingFunction
+from crewai_tools import MDXSearchTool
+from crewai_tools.rag.data_types import DataType
+from crewai_tools.tools.rag.rag_tool import RagTool
+from pydantic import PrivateAttr
+
+from tools.ingest import file_hash
+
+logger = logging.getLogger(__name__)
+
+# Persistent vector store of the markdown documents searched by the crews. Chunks are embedded
+# once per file content and embedding model, then reused across tasks and runs.
+#   EMBEDDING_STORE_PATH  directory of the Chroma store
+#   EMBEDDING_PROVIDER    crewai embedding provider (default openai), or "hashing" for the local,
+#                         offline embedder below
+#   EMBEDDING_MODEL       model of the provider (default text-embedding-3-small)
+DEFAULT_STORE_PATH = "~/.cache/cv-pilot/embeddings"
+DEFAULT_PROVIDER = "openai"
+DEFAULT_MODEL = "text-embedding-3-small"
+HASHING_DIMENSIONS = 384
+# bag of words vectors sharing a few words with a query score well under the 0.6 default of
+# RagTool, the hashing embedder returns the closest chunks whatever their score
+HASHING_SIMILARITY_THRESHOLD = 0.0
+
+
+class HashingEmbeddingFunction(CustomEmbeddingFunction, EmbeddingFunction):
+    """
+    Local embedder for offline runs and tests: bag of words hashed into a fixed number of
+    dimensions and L2 normalised. No network and no model download, deterministic across runs.
+    """
+
+    def __init__(self, dimensions: int = HASHING_DIMENSIONS, **kwargs: Any):
+        self.dimensions = dimensions
+
+    def __call__(self, input):
+        embeddings = []
+        for text in input:
+            vector = np.zeros(self.dimensions, dtype=np.float32)
+            for token in re.findall(r"\w+", text.lower()):
+                digest = hashlib.blake2b(token.encode("utf-8"), digest_size=8).digest()
+                vector[int.from_bytes(digest, "little") % self.dimensions] += 1.0
+            norm = np.linalg.norm(vector)
+            embeddings.append(vector / norm if norm else vector)
+        return embeddings
+
+    @staticmethod
+    def name() -> str:
+        return "cv-pilot-hashing"
+
+    def get_config(self):
+        return {"dimensions": self.dimensions}
+
+    @staticmethod
+    def build_from_config(config):
+        return HashingEmbeddingFunction(**config)
+
+
+def embedding_model():
+    '''
+    This function returns the embedding provider and model selected with the environment.
+    Output: (provider, model) tuple
+    '''
+    provider = os.getenv("EMBEDDING_PROVIDER", DEFAULT_PROVIDER).strip().lower()
+    if provider == "hashing":
+        return provider, f"{HASHING_DIMENSIONS}d"
+    return provider, os.getenv("EMBEDDING_MODEL", DEFAULT_MODEL).strip()
+
+
+def embedder_spec(provider, model):
+    '''
+    This function builds the crewai embedding specification of a provider and model.
+    Input: Provider name, model name
+    Output: Provider specification dict
+    '''
+    if provider == "hashing":
+        return {"provider": "custom", "config": {"embedding_callable": HashingEmbeddingFunction}}
+    return {"provider": provider, "config": {"model_name": model}}
+
+
+def collection_name(provider, model):
+    # chunks embedded by different models can't be compared, each model has its own collection
+    name = re.sub(r"[^A-Za-z0-9_-]+", "-", f"mdx-{provider}-{model}").strip("-_")
+    return name[:63]
+
+
+def similarity_score(distance, metric):
+    # same conversion as the crewai Chroma client, embeddings are unit normalised
+    if metric == "cosine":
+        return max(0.0, min(1.0, 1.0 - 0.5 * distance))
+    return max(0.0, min(1.0, 1.0 / (1.0 + distance)))
+
+
+class PersistentMDXSearchTool(MDXSearchTool):
+    """
+    MDXSearchTool backed by a persistent Chroma store: a document is embedded only when no chunk
+    of the store has its content hash yet, so re-running an application against an unchanged
+    resume or job description does no embedding at all. A search only returns chunks of the
+    document it names (or of the documents added to this tool when it names none).
+    """
+
+    _store_path: Path = PrivateAttr()
+    _settings: Any = PrivateAttr()
+    _embedder: Any = PrivateAttr(default=None)
+    _content_hashes: dict = PrivateAttr(default_factory=dict)
+    _lock: Any = PrivateAttr(default_factory=threading.Lock)
+
+    def __init__(self, store_path: Optional[str] = None, **kwargs: Any):
+        from chromadb.config import Settings
+
+        store_path = Path(store_path or os.getenv("EMBEDDING_STORE_PATH") or DEFAULT_STORE_PATH).expanduser()
+        store_path.mkdir(parents=True, exist_ok=True)
+        provider, model = embedding_model()
+        settings = Settings(
+            persist_directory=str(store_path),
+            is_persistent=True,
+            anonymized_telemetry=False,
+        )
+        kwargs.setdefault("collection_name", collection_name(provider, model))
+        kwargs.setdefault("config", {
+            "embedding_model": embedder_spec(provider, model),
+            "vectordb": {"provider": "chromadb", "config": {"settings": settings}},
+        })
+        if provider == "hashing":
+            kwargs.setdefault("similarity_threshold", HASHING_SIMILARITY_THRESHOLD)
+        super().__init__(**kwargs)
+        self._store_path = store_path
+        self._settings = settings
+        logger.info(f"🗂️ Embedding store: {store_path} ({provider}/{model})")
+
+    def add(self, mdx: str) -> None:
+        content_hash = file_hash(mdx)
+        with self._lock:
+            # the store itself is the record of what is embedded: chunk ids are derived from the
+            # source and its content, a document embedded by two runs at once is upserted, not duplicated
+            if not self.embedded(content_hash):
+                RagTool.add(self, mdx, data_type=DataType.MDX, metadata={"content_hash": content_hash})
+                logger.info(f"🧮 Embedded {mdx}")
+            else:
+                logger.debug(f"Embeddings of {mdx} found in the store")
+            self._content_hashes[str(mdx)] = content_hash
+
+    def _run(  # type: ignore[override]
+        self,
+        search_query: str,
+        mdx: Optional[str] = None,
+        similarity_threshold: Optional[float] = None,
+        limit: Optional[int] = None,
+    ) -> str:
+        if mdx is not None:
+            self.add(mdx)
+            hashes = [self._content_hashes[str(mdx)]]
+        else:
+            hashes = sorted(set(self._content_hashes.values()))
+        if not hashes:
+            # never fall back to the whole store, it holds the documents of other applications
+            return "Relevant Content:\nNo relevant content found."
+
+        threshold = similarity_threshold if similarity_threshold is not None else self.similarity_threshold
+        contents = [content for content, score in self.search(search_query, hashes, limit) if score >= threshold]
+        contents = "\n\n".join(contents)
+        return f"Relevant Content:\n{contents or 'No relevant content found.'}"
+
+    def collection(self):
+        '''
+        This function opens the Chroma collection the tool writes to.
+        Output: Collection, or None when nothing was embedded in it yet
+        '''
+        import chromadb
+        from chromadb.errors import NotFoundError
+
+        try:
+            return chromadb.Client(self._settings).get_collection(self.collection_name)
+        except NotFoundError:
+            return None
+
+    def embedded(self, content_hash: str) -> bool:
+        '''
+        This function tells whether the store holds the chunks of a document.
+        Input: Content hash of the document
+        Output: True when at least one chunk has this content hash
+        '''
+        collection = self.collection()
+        if collection is None:
+            return False
+        return bool(collection.get(where={"content_hash": content_hash}, limit=1, include=[])["ids"])
+
+    def search(self, query: str, hashes: list, limit: Optional[int] = None) -> list:
+        '''
+        This function searches the chunks of the documents with the given content hashes, on the
+        Chroma store the tool writes to (RagTool searches can't filter on metadata).
+        Input: Query, content hashes, maximum number of chunks
+        Output: List of (content, similarity score) tuples, most similar first
+        '''
+        collection = self.collection()
+        if collection is None or not hashes:
+            return []
+        if self._embedder is None:
+            provider, model = embedding_model()
+            self._embedder = build_embedder(embedder_spec(provider, model))
+        results = collection.query(
+            query_embeddings=[np.asarray(e, dtype=np.float32) for e in self._embedder([query])],
+            n_results=limit if limit is not None else self.limit,
+            where={"content_hash": {"$in": hashes}},
+            include=["documents", "distances"],
+        )
+        metric = (collection.metadata or {}).get("hnsw:space", "l2")
+        return [(document, similarity_score(distance, metric))
+                for document, distance in zip(results["documents"][0], results["distances"][0]) if document]
@@ -0,0 +1,179 @@
+import hashlib
+import logging
+import os
+import re
+import tempfile
+import unicodedata
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import NamedTuple
+from xml.etree import ElementTree
+
+logger = logging.getLogger(__name__)
+
+# Resumes and job descriptions are turned into normalized text once per file content: the text
+# is stored as <sha256>.md under INGEST_CACHE_DIR, and that file is what the crews read and what
+# analyze.py scores. The default directory is relative to the working directory, because
+# crewai_tools only reads files below it. Bump INGEST_VERSION when extraction or normalization changes.
+INGEST_VERSION = 1
+DEFAULT_CACHE_DIR = ".cv-pilot/documents"
+# file types with a dedicated extractor; anything else is read as UTF-8 text
+DOCUMENT_SUFFIXES = ('.pdf', '.docx', '.md', '.markdown', '.txt')
+# PDFs with at least this many pages are extracted by a process pool
+PARALLEL_MIN_PAGES = 32
+
+_WORD = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+# soft hyphen, zero width characters and byte order mark
+_INVISIBLE = dict.fromkeys(map(ord, "\u00ad\u200b\u200c\u200d\u2060\ufeff"))
+
+
+class Document(NamedTuple):
+    source: Path
+    text: str
+    text_path: Path
+    content_hash: str
+
+
+def normalize_text(text):
+    '''
+    This function normalizes the characters of a text: compatibility characters (ligatures,
+    non-breaking spaces, full width forms), line endings and invisible characters. The layout
+    is kept, blank lines affect the part of speech tagging of the keywords analyzer.
+    Input: Text data
+    Output: Normalized text
+    '''
+    text = unicodedata.normalize("NFKC", text)
+    return text.replace("\r\n", "\n").replace("\r", "\n").translate(_INVISIBLE)
+
+
+def tidy_layout(text):
+    # extracted text only: trailing spaces and runs of blank lines left by the page layout
+    text = "\n".join(line.rstrip() for line in text.split("\n"))
+    return re.sub(r"\n{3,}", "\n\n", text).strip() + "\n"
+
+
+def _pdf_pages(path, start, stop):
+    import fitz
+
+    with fitz.open(path) as pdf:
+        # words hyphenated at the end of a line are joined back together
+        return [re.sub(r"(\w)-\n(\w)", r"\1\2", pdf[number].get_text("text", sort=True))
+                for number in range(start, stop)]
+
+
+def extract_pdf(path, processes=None):
+    '''
+    This function extracts the text of a PDF page by page. Large files are split in page ranges
+    extracted by a process pool.
+    Input: PDF path, number of worker processes (default: one per CPU)
+    Output: Text data, pages separated by a blank line
+    '''
+    import fitz
+
+    with fitz.open(path) as pdf:
+        page_count = pdf.page_count
+    processes = min(processes or os.cpu_count() or 1, page_count)
+    if page_count < PARALLEL_MIN_PAGES or processes < 2:
+        pages = _pdf_pages(path, 0, page_count)
+    else:
+        step = -(-page_count // processes)
+        ranges = [(start, min(start + step, page_count)) for start in range(0, page_count, step)]
+        with ProcessPoolExecutor(max_workers=len(ranges)) as pool:
+            chunks = pool.map(_pdf_pages, [str(path)] * len(ranges), *zip(*ranges))
+            pages = [page for chunk in chunks for page in chunk]
+    return "\n\n".join(page.strip() for page in pages)
+
+
+def extract_docx(path):
+    '''
+    This function extracts the paragraphs of a DOCX file, table cells included, as markdown:
+    headings get their # prefix and list items a dash.
+    Input: DOCX path
+    Output: Text data
+    '''
+    with zipfile.ZipFile(path) as docx:
+        root = ElementTree.fromstring(docx.read("word/document.xml"))
+
+    paragraphs = []
+    for paragraph in root.iter(f"{_WORD}p"):
+        parts = []
+        for node in paragraph.iter():
+            if node.tag == f"{_WORD}t":
+                parts.append(node.text or "")
+            elif node.tag == f"{_WORD}tab":
+                parts.append("\t")
+            elif node.tag in (f"{_WORD}br", f"{_WORD}cr"):
+                parts.append("\n")
+        text = "".join(parts).strip()
+        if not text:
+            continue
+        style = paragraph.find(f"{_WORD}pPr/{_WORD}pStyle")
+        style = style.get(f"{_WORD}val", "") if style is not None else ""
+        if style.startswith("Heading") and style[len("Heading"):].isdigit():
+            text = "#" * min(int(style[len("Heading"):]), 6) + " " + text
+        elif style == "Title":
+            text = "# " + text
+        elif paragraph.find(f"{_WORD}pPr/{_WORD}numPr") is not None:
+            text = "- " + text
+        paragraphs.append(text)
+    return "\n\n".join(paragraphs)
+
+
+def extract_text(path, processes=None):
+    '''
+    This function extracts the raw text of a resume or job description.
+    Input: File path, number of worker processes for large PDFs
+    Output: Text data
+    '''
+    suffix = Path(path).suffix.lower()
+    if suffix == '.pdf':
+        return tidy_layout(extract_pdf(path, processes))
+    if suffix == '.docx':
+        return tidy_layout(extract_docx(path))
+    return Path(path).read_text(encoding="utf-8")
+
+
+def file_hash(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def cache_dir():
+    return Path(os.getenv("INGEST_CACHE_DIR") or DEFAULT_CACHE_DIR).expanduser().resolve() / f"v{INGEST_VERSION}"
+
+
+def ingest(path, processes=None):
+    '''
+    This function returns the normalized text of a document, extracting it only when no text of
+    the same file content is cached yet.
+    Input: File path, number of worker processes for large PDFs
+    Output: Document with the text and the path of its normalized .md copy
+    '''
+    path = Path(path).expanduser()
+    content_hash = file_hash(path)
+    text_path = cache_dir() / f"{content_hash}.md"
+    if text_path.exists():
+        return Document(path, text_path.read_text(encoding="utf-8"), text_path, content_hash)
+
+    text = normalize_text(extract_text(path, processes))
+    text_path.parent.mkdir(parents=True, exist_ok=True)
+    # written aside and renamed, so a concurrent run never reads a partial file
+    with tempfile.NamedTemporaryFile("w", encoding="utf-8", dir=text_path.parent, suffix=".tmp",
+                                     delete=False) as f:
+        f.write(text)
+    os.replace(f.name, text_path)
+    logger.info(f"📥 Ingested {path} ({len(text)} characters)")
+    return Document(path, text, text_path, content_hash)
+
+
+def document_text(path, processes=None):
+    '''
+    This function returns the normalized text of a resume or job description.
+    Input: File path, number of worker processes for large PDFs
+    Output: Text data
+    '''
+    return ingest(path, processes).text
@@ -0,0 +1,66 @@
+import time
+from collections import defaultdict
+from contextlib import ExitStack, contextmanager
+from contextvars import ContextVar
+
+# Stages are exported as OpenTelemetry spans when the API is installed (langtrace brings it and
+# registers the tracer provider in gen_application.py); otherwise only the timings are recorded.
+try:
+    from opentelemetry import trace
+    _tracer = trace.get_tracer("cv-pilot.keywords_analyzer")
+except ImportError:
+    _tracer = None
+
+_current_timer: ContextVar = ContextVar("stage_timer", default=None)
+
+
+class StageTimer:
+    '''
+    Accumulates the wall time spent in each named stage while it is active.
+    '''
+
+    def __init__(self):
+        self.timings = defaultdict(float)
+        self.calls = defaultdict(int)
+
+    @contextmanager
+    def activate(self):
+        token = _current_timer.set(self)
+        try:
+            yield self
+        finally:
+            _current_timer.reset(token)
+
+    def as_dict(self):
+        '''
+        Returns {stage: {"ms": total milliseconds, "calls": count}}.
+        '''
+        return {name: {"ms": round(seconds * 1000, 3), "calls": self.calls[name]}
+                for name, seconds in self.timings.items()}
+
+
+@contextmanager
+def stage(name, **attributes):
+    '''
+    This function times a stage of the analyzer into the active StageTimer and a tracing span.
+    Input: Stage name, span attributes
+    '''
+    timer = _current_timer.get()
+    if timer is None and _tracer is None:
+        yield
+        return
+
+    with ExitStack() as stack:
+        span = stack.enter_context(_tracer.start_as_current_span(f"keywords_analyzer.{name}")) if _tracer else None
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - started
+            if timer is not None:
+                timer.timings[name] += elapsed
+                timer.calls[name] += 1
+            if span is not None:
+                for key, value in attributes.items():
+                    span.set_attribute(key, value)
+                span.set_attribute("duration_ms", elapsed * 1000)
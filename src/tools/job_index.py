@@ -0,0 +1,157 @@
+import json
+from pathlib import Path
+from typing import List
+
+import numpy as np
+import sklearn
+from scipy.sparse import csr_matrix
+from sklearn.feature_extraction.text import CountVectorizer, TfidfVectorizer
+from sklearn.preprocessing import normalize
+
+from tools.batch_scoring import read_documents
+from tools.keywords_analyzer_tool import spacy_keywords, spacy_keywords_batch, spacy_pipeline_version
+
+# Index layout: meta.json holds the posting names and the fixed vocabularies, every array is a
+# .npy file loaded with mmap_mode='r', so opening an index of 50k postings reads almost nothing.
+#   tfidf_{data,indices,indptr}.npy     posting x term TF-IDF matrix (CSR, rows L2 normalised)
+#   idf.npy                             IDF weight of each term
+#   keywords_{indices,indptr}.npy       posting -> keyword ids (forward keyword index)
+#   postings_{indices,indptr}.npy       keyword -> posting ids (inverted keyword index)
+INDEX_META = 'meta.json'
+
+
+def _identity(keywords):
+    return keywords
+
+
+def _save(index_dir, name, array):
+    np.save(index_dir / f"{name}.npy", np.ascontiguousarray(array))
+
+
+def _load(index_dir, name):
+    return np.load(index_dir / f"{name}.npy", mmap_mode='r')
+
+
+def index_versions():
+    '''
+    This function identifies what the index content depends on: the spacy pipeline tagging the
+    keywords and the sklearn version of the vectorizers.
+    Output: Dict of versions, as stored in the index metadata
+    '''
+    return {'pipeline': spacy_pipeline_version(), 'sklearn': sklearn.__version__}
+
+
+def build_index(directory, index_dir, n_process=1):
+    '''
+    This function builds the job postings index of a directory of job descriptions.
+    Input: Directory of job descriptions, index directory, number of spacy processes
+    Output: Number of indexed postings
+    '''
+    index_dir = Path(index_dir)
+    index_dir.mkdir(parents=True, exist_ok=True)
+
+    documents = read_documents(directory)
+    names, texts = list(documents), list(documents.values())
+
+    tfidf = TfidfVectorizer()
+    tfidf_matrix = tfidf.fit_transform(texts).tocsr()
+    vocabulary = tfidf.get_feature_names_out().tolist()
+
+    keywords = spacy_keywords_batch(texts, n_process=n_process)
+    keyword_vectorizer = CountVectorizer(analyzer=_identity, binary=True)
+    keyword_matrix = keyword_vectorizer.fit_transform(keywords).tocsr()
+    keyword_matrix.sort_indices()
+    inverted = keyword_matrix.tocsc()
+    inverted.sort_indices()
+
+    _save(index_dir, 'tfidf_data', tfidf_matrix.data.astype(np.float32))
+    _save(index_dir, 'tfidf_indices', tfidf_matrix.indices)
+    _save(index_dir, 'tfidf_indptr', tfidf_matrix.indptr)
+    _save(index_dir, 'idf', tfidf.idf_)
+    _save(index_dir, 'keywords_indices', keyword_matrix.indices)
+    _save(index_dir, 'keywords_indptr', keyword_matrix.indptr)
+    _save(index_dir, 'postings_indices', inverted.indices)
+    _save(index_dir, 'postings_indptr', inverted.indptr)
+
+    meta = {
+        'names': names,
+        'vocabulary': vocabulary,
+        'keywords': keyword_vectorizer.get_feature_names_out().tolist(),
+        **index_versions(),
+    }
+    (index_dir / INDEX_META).write_text(json.dumps(meta), encoding='utf-8')
+    return len(names)
+
+
+class JobIndex:
+    '''
+    Read-only job postings index built by build_index.
+
+    A query only scores the postings sharing at least one keyword with the resume, found through
+    the inverted keyword index, and ranks them by TF-IDF cosine similarity. An index built with
+    another spacy pipeline or sklearn version is refused: its keywords and vocabulary would not
+    match those of the resume.
+    '''
+
+    def __init__(self, index_dir):
+        index_dir = Path(index_dir)
+        meta = json.loads((index_dir / INDEX_META).read_text(encoding='utf-8'))
+        stale = [f"{name} {meta.get(name)} (now {version})"
+                 for name, version in index_versions().items() if meta.get(name) != version]
+        if stale:
+            raise RuntimeError(f"the index was built with {', '.join(stale)}: "
+                               f"rebuild it with `analyze.py --index build`")
+        self.names = meta['names']
+        self.keywords = meta['keywords']
+        self._keyword_ids = {k: i for i, k in enumerate(self.keywords)}
+        self._vectorizer = CountVectorizer(vocabulary=meta['vocabulary'])
+        self._idf = _load(index_dir, 'idf')
+        self._tfidf = csr_matrix(
+            (_load(index_dir, 'tfidf_data'), _load(index_dir, 'tfidf_indices'), _load(index_dir, 'tfidf_indptr')),
+            shape=(len(self.names), len(meta['vocabulary'])),
+            copy=False,
+        )
+        self._posting_keywords = (_load(index_dir, 'keywords_indices'), _load(index_dir, 'keywords_indptr'))
+        self._keyword_postings = (_load(index_dir, 'postings_indices'), _load(index_dir, 'postings_indptr'))
+
+    def _vector(self, text):
+        counts = self._vectorizer.transform([text]).astype(np.float64)
+        return normalize(counts.multiply(self._idf).tocsr())
+
+    def _candidates(self, keyword_ids):
+        indices, indptr = self._keyword_postings
+        postings = [indices[indptr[k]:indptr[k + 1]] for k in keyword_ids]
+        if not postings:
+            return np.empty(0, dtype=np.int64)
+        return np.unique(np.concatenate(postings))
+
+    def query(self, resume: str, top_k: int = 10) -> List[dict]:
+        '''
+        Returns the top_k postings for the resume, with matched and missing keywords.
+        '''
+        resume_keywords = set(spacy_keywords(resume))
+        keyword_ids = sorted(self._keyword_ids[k] for k in resume_keywords if k in self._keyword_ids)
+        candidates = self._candidates(keyword_ids)
+        if not len(candidates):
+            return []
+
+        scores = (self._tfidf[candidates] @ self._vector(resume).T).toarray().ravel()
+        top_k = min(top_k, len(candidates))
+        top = np.argpartition(-scores, top_k - 1)[:top_k]
+        top = top[np.argsort(-scores[top], kind='stable')]
+
+        indices, indptr = self._posting_keywords
+        results = []
+        for i in top:
+            posting = int(candidates[i])
+            posting_keywords = [self.keywords[k] for k in indices[indptr[posting]:indptr[posting + 1]]]
+            matched = [k for k in posting_keywords if k in resume_keywords]
+            missing = [k for k in posting_keywords if k not in resume_keywords]
+            results.append({
+                'job_description': self.names[posting],
+                'cosine_similarity': round(float(scores[i]) * 100, 2),
+                'keywords_match': round(len(matched) / len(posting_keywords) * 100, 2) if posting_keywords else 0.0,
+                'matched_keywords': matched,
+                'missing_keywords': missing,
+            })
+        return results
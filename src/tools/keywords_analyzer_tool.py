@@ -1,18 +1,164 @@
 import os
+import hashlib
+import json
+import math
+import re
+from functools import lru_cache
+from itertools import chain, islice
 import subprocess
+from collections import Counter, OrderedDict
 from pathlib import Path
-from typing import Optional, List, Dict, Type
+from typing import Optional, List, Dict, Type, NamedTuple
+import numpy as np
 from pydantic import BaseModel, Field, PrivateAttr
 from crewai.tools.base_tool import BaseTool
 import argparse
 from pathlib import Path
-import nltk
-import textract
-nltk.download('averaged_perceptron_tagger_eng')
-from sklearn.feature_extraction.text import CountVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
-import spacy
-nlp = spacy.load('en_core_web_sm')
+from tools.disk_cache import disk_cache_from_env
+from tools.instrumentation import StageTimer, stage
+from tools.phrase_matcher import PhraseMatcher, compiled_matcher, phrase_tokens
+
+# spacy, nltk and sklearn take seconds to import: they are imported by the functions that use them,
+# so importing this module (and the crews that use the tool) stays cheap until the first analysis.
+
+# spacy model used for keywords extraction (package name or path)
+SPACY_MODEL = os.getenv("SPACY_MODEL", "en_core_web_sm")
+# pipeline components not loaded at all: spacy_keywords only reads the part-of-speech tags,
+# so only tok2vec, tagger and attribute_ruler are needed. Set SPACY_EXCLUDE to a comma
+# separated list to pick the pipeline, or to an empty string to load the full model.
+SPACY_EXCLUDE = os.getenv("SPACY_EXCLUDE", "parser,ner,lemmatizer,senter")
+# optional skills list (one skill per line, # starts a comment): every skill found in a job
+# description becomes one of its keyphrases, e.g. product names the tagger does not see as nouns
+SKILLS_FILE = os.getenv("SKILLS_FILE", "")
+# texts longer than ANALYSIS_CHUNK_CHARS (scraped pages, job description dumps) are split at
+# paragraph or sentence boundaries and the chunks are tagged by ANALYSIS_PROCESSES processes
+# (default: one per CPU); shorter texts are tagged in one call, in process
+ANALYSIS_CHUNK_CHARS = int(os.getenv("ANALYSIS_CHUNK_CHARS", 100_000))
+ANALYSIS_PROCESSES = int(os.getenv("ANALYSIS_PROCESSES", 0))
+
+
+@lru_cache(maxsize=None)
+def load_spacy(model=SPACY_MODEL, exclude=SPACY_EXCLUDE):
+    '''
+    This function loads the spacy pipeline once, on first use, without the excluded components.
+    Input: Model name or path, comma separated components to exclude
+    Output: spacy Language pipeline
+    '''
+    import spacy
+    exclude_list = [c.strip() for c in exclude.split(',') if c.strip()]
+    return spacy.load(model, exclude=exclude_list)
+
+
+@lru_cache(maxsize=None)
+def spacy_pipeline_version(model=SPACY_MODEL, exclude=SPACY_EXCLUDE):
+    '''
+    This function identifies the spacy pipeline without loading it, to version cached results.
+    Input: Model name or path, comma separated components to exclude
+    Output: Version string
+    '''
+    import spacy
+    model_version = spacy.util.get_package_version(model)
+    if model_version is None:
+        meta_path = Path(model) / 'meta.json'
+        model_version = spacy.util.load_meta(meta_path)['version'] if meta_path.exists() else 'unknown'
+    return f"spacy={spacy.__version__};model={model}@{model_version};exclude={exclude}"
+
+
+# Optional persistent cache of keywords and count vectors, shared across runs and worker
+# processes. Set ANALYSIS_CACHE_PATH to a SQLite file to enable it; ANALYSIS_CACHE_MAX_MB
+# caps its size (least recently used entries are evicted first).
+@lru_cache(maxsize=None)
+def analysis_cache():
+    '''
+    This function returns the persistent analysis cache, or None when it is not enabled.
+    Output: DiskCache or None
+    '''
+    return disk_cache_from_env("ANALYSIS_CACHE_PATH", "ANALYSIS_CACHE_MAX_MB")
+
+
+def cached_analysis(namespace, version, text, compute):
+    '''
+    This function serves an analysis result from the persistent analysis cache, computing and
+    storing it on a miss. Without a cache it just computes the result.
+    Input: Cache namespace, pipeline version, text data, function computing the result from the text
+    Output: Analysis result
+    '''
+    cache = analysis_cache()
+    if cache is None:
+        return compute(text)
+    key = f"{version}:{text_hash(text)}"
+    result = cache.get(namespace, key)
+    if result is None:
+        result = compute(text)
+        cache.set(namespace, key, result)
+    return result
+
+# NLTK resources used by the nltk pipeline, with the data package the installed NLTK loads them
+# from: NLTK 3.8.2 and later read the tokenizer and the tagger from punkt_tab and
+# averaged_perceptron_tagger_eng, older releases from punkt and averaged_perceptron_tagger.
+# Nothing is downloaded at runtime: install them with `python -m nltk.downloader <package>`.
+NLTK_RESOURCES = {
+    'punkt': {'current': ('punkt_tab', 'tokenizers/punkt_tab/english/'),
+              'legacy': ('punkt', 'tokenizers/punkt/english.pickle')},
+    'averaged_perceptron_tagger': {'current': ('averaged_perceptron_tagger_eng', 'taggers/averaged_perceptron_tagger_eng/'),
+                                   'legacy': ('averaged_perceptron_tagger',
+                                              'taggers/averaged_perceptron_tagger/averaged_perceptron_tagger.pickle')},
+    'stopwords': {'current': ('stopwords', 'corpora/stopwords'),
+                  'legacy': ('stopwords', 'corpora/stopwords')},
+}
+
+
+@lru_cache(maxsize=None)
+def nltk_data_generation():
+    '''
+    This function tells which data packages the installed NLTK loads.
+    Output: 'current' (punkt_tab, averaged_perceptron_tagger_eng) or 'legacy' (punkt, averaged_perceptron_tagger)
+    '''
+    import nltk.tokenize
+    # PunktTokenizer came with the punkt_tab and *_eng data packages
+    return 'current' if hasattr(nltk.tokenize, 'PunktTokenizer') else 'legacy'
+
+
+@lru_cache(maxsize=None)
+def nltk_resource(name):
+    '''
+    This function checks, offline and once per process, that the NLTK resource the installed
+    NLTK loads is installed.
+    Input: Resource name (key of NLTK_RESOURCES)
+    Output: Path of the installed resource, raises LookupError when it is missing
+    '''
+    import nltk
+    package, location = NLTK_RESOURCES[name][nltk_data_generation()]
+    try:
+        return nltk.data.find(location)
+    except LookupError:
+        raise LookupError(
+            f"NLTK resource `{name}` is not installed and it is not downloaded at runtime. "
+            f"NLTK {nltk.__version__} reads it from the `{package}` data package: install it with "
+            f"`python -m nltk.downloader {package}`, set NLTK_DATA to use a custom data directory."
+        ) from None
+
+
+@lru_cache(maxsize=None)
+def nltk_stopwords():
+    '''
+    This function loads the NLTK english stopwords once and keeps them in memory.
+    Output: Stopwords set
+    '''
+    nltk_resource('stopwords')
+    from nltk.corpus import stopwords
+    return frozenset(stopwords.words('english'))
+
+
+@lru_cache(maxsize=None)
+def nltk_tagger():
+    '''
+    This function loads the NLTK perceptron tagger once and keeps it in memory.
+    Output: PerceptronTagger
+    '''
+    nltk_resource('averaged_perceptron_tagger')
+    from nltk.tag.perceptron import PerceptronTagger
+    return PerceptronTagger()
 
 
 def write_file(file_name, write_mode, write_string):
@@ -69,7 +215,7 @@ def nltk_tokenizer(text):
     Input: Text string
     Output: Tokens
     '''
-    nltk.download('punkt')
+    nltk_resource('punkt')
     from nltk import word_tokenize
     tokens = word_tokenize(text)
     #tokens = text.split()
@@ -81,9 +227,7 @@ def nltk_pos_tag(token_list):
     Input: Token List
     Output: Tagged token list
     '''
-    nltk.download('averaged_perceptron_tagger')
-    from nltk import pos_tag
-    tagged_list = pos_tag(token_list)
+    tagged_list = nltk_tagger().tag(token_list)
     return tagged_list
 
 def nltk_stopwords_removal(token_list):
@@ -92,27 +236,61 @@ def nltk_stopwords_removal(token_list):
     Input: Token List
     Output: Stopwords filtered list
     '''
-    nltk.download('stopwords')
-    from nltk.corpus import stopwords
-    stop_words = set(stopwords.words('english'))
+    stop_words = nltk_stopwords()
     stopwords_filtered_list = [w for w in token_list if w not in stop_words]
     return stopwords_filtered_list
 
 def nltk_keywords(data):
     '''
     This function contains the NLTK pipeline to detect keywords from input text data.
+    Results are served from the persistent analysis cache when it is enabled.
     Input: Text data
     Output: Keywords
     '''
-    data = clean_text(data)
-    tokens = nltk_tokenizer(data)
-    pos_tagged_tokens = nltk_pos_tag(tokens)
-    keywords = filter_token_tag(pos_tagged_tokens, ['NNP', 'NN', 'VBP', 'JJ'])
-    keywords = nltk_stopwords_removal(keywords)
-    keywords = unique_tokens(keywords)
+    return cached_analysis('nltk_keywords', nltk_keywords_version(data), data, _nltk_keywords)
+
+def nltk_keywords_version(data):
+    # a large text is tagged chunk by chunk, its chunk size is part of the version
+    import nltk
+    version = f"nltk={nltk.__version__}"
+    return f"{version};chunk_chars={ANALYSIS_CHUNK_CHARS}" if len(data) > ANALYSIS_CHUNK_CHARS else version
+
+def _nltk_keywords(data):
+    if len(data) > ANALYSIS_CHUNK_CHARS:
+        return nltk_chunked_keywords(data)
+    with stage('clean_text'):
+        data = clean_text(data)
+    with stage('tagging', pipeline='nltk'):
+        tokens = nltk_tokenizer(data)
+        pos_tagged_tokens = nltk_pos_tag(tokens)
+    with stage('filtering'):
+        keywords = filter_token_tag(pos_tagged_tokens, ['NNP', 'NN', 'VBP', 'JJ'])
+    with stage('stopwords'):
+        keywords = nltk_stopwords_removal(keywords)
+    with stage('dedup'):
+        keywords = unique_tokens(keywords)
     #print('NLTK Keywords: ', keywords)
     return keywords
 
+def nltk_chunked_keywords(data, max_chars=ANALYSIS_CHUNK_CHARS, processes=None):
+    '''
+    This function runs the NLTK pipeline on the chunks of a large text in a process pool and
+    merges their keywords in text order.
+    Input: Text data, maximum chunk size, number of processes (default: ANALYSIS_PROCESSES)
+    Output: Keywords
+    '''
+    from concurrent.futures import ProcessPoolExecutor
+    chunks = split_chunks(data, max_chars)
+    processes = analysis_processes(len(chunks), processes)
+    with stage('tagging', pipeline='nltk', chunks=len(chunks), processes=processes):
+        if processes < 2:
+            chunk_keywords = [_nltk_keywords(chunk) for chunk in chunks]
+        else:
+            with ProcessPoolExecutor(max_workers=processes) as pool:
+                chunk_keywords = list(pool.map(_nltk_keywords, chunks))
+    with stage('dedup'):
+        return list(dict.fromkeys(word for keywords in chunk_keywords for word in keywords))
+
 
 
 def spacy_tokenizer(text):
@@ -121,7 +299,7 @@ def spacy_tokenizer(text):
     Input: Text string
     Output: Tokens
     '''
-    tokens = nlp(text)
+    tokens = load_spacy()(text)
     #tokens = text.split()
     return tokens
 
@@ -142,25 +320,559 @@ def spacy_stopwords_removal(token_list):
     Input: Token List
     Output: Stopwords filtered list
     '''
-    stop_words = nlp.Defaults.stop_words
+    stop_words = load_spacy().Defaults.stop_words
     stopwords_filtered_list = [w for w in token_list if w not in stop_words]
     return stopwords_filtered_list
 
+def spacy_keywords_version(data):
+    # chunk boundaries affect the tagging of a large text, its chunk size is part of the version
+    version = spacy_pipeline_version()
+    return f"{version};chunk_chars={ANALYSIS_CHUNK_CHARS}" if len(data) > ANALYSIS_CHUNK_CHARS else version
+
 def spacy_keywords(data):
     '''
     This function contains the spacy pipeline to detect keywords from input text data.
+    Results are served from the persistent analysis cache when it is enabled.
     Input: Text data
     Output: Keywords
     '''
-    data = clean_text(data)
-    tokens = spacy_tokenizer(data)
-    pos_tagged_tokens = spacy_pos_tag(tokens)
-    keywords = filter_token_tag(pos_tagged_tokens, 'NNP')
-    keywords = spacy_stopwords_removal(keywords)
-    keywords = unique_tokens(keywords)
+    return cached_analysis('spacy_keywords', spacy_keywords_version(data), data, _spacy_keywords)
+
+def _spacy_keywords(data):
+    if len(data) > ANALYSIS_CHUNK_CHARS:
+        return spacy_chunked_keywords(data)
+    with stage('clean_text'):
+        data = clean_text(data)
+    with stage('tagging', pipeline='spacy'):
+        tokens = spacy_tokenizer(data)
+    keywords = spacy_doc_keywords(tokens)
     #print('Spacy Keywords: ', keywords)
     return keywords
 
+def spacy_doc_keywords(tokens):
+    '''
+    This function detects keywords from text already tokenised and tagged by spacy.
+    Input: spacy Doc
+    Output: Keywords
+    '''
+    strings = tokens.vocab.strings
+    return [strings[int(h)] for h in spacy_doc_keyword_hashes(tokens)]
+
+# Keywords are reduced to spacy string hashes (uint64) as soon as a Doc is tagged: no Token
+# object keeps the Doc alive, a keyword costs 8 bytes instead of a Python string, and dedup and
+# matching run on integer arrays. The hashes don't depend on the pipeline, so keywords read back
+# from the analysis cache map to the same integers.
+def keyword_hashes(keywords):
+    '''
+    This function maps keywords to their spacy string hashes.
+    Input: Keywords
+    Output: uint64 array, in keyword order
+    '''
+    from spacy.strings import hash_string
+    return np.fromiter((hash_string(w) for w in keywords), dtype=np.uint64, count=len(keywords))
+
+@lru_cache(maxsize=None)
+def spacy_stopword_hashes():
+    return np.unique(keyword_hashes(list(load_spacy().Defaults.stop_words)))
+
+def spacy_doc_keyword_hashes(tokens):
+    '''
+    This function detects keywords from a spacy Doc on the arrays of its token attributes,
+    without creating Token objects: same keywords as tagging, stopwords removal and dedup of
+    the tokens, as lower case string hashes.
+    Input: spacy Doc
+    Output: uint64 array of unique keyword hashes, in order of first occurrence
+    '''
+    from spacy.attrs import LOWER, ORTH, TAG
+    strings = tokens.vocab.strings
+    with stage('filtering'):
+        columns = tokens.to_array([ORTH, LOWER, TAG]).reshape(-1, 3)
+        # tags are tested with `in 'NNP'`, as filter_token_tag does with a string: NN and the
+        # empty tag are kept as well
+        tags = [tag for tag in np.unique(columns[:, 2]) if strings[int(tag)] in 'NNP']
+        columns = columns[np.isin(columns[:, 2], tags)]
+    with stage('stopwords'):
+        # spacy stopwords are matched on the original case, before lower casing
+        columns = columns[~np.isin(columns[:, 0], spacy_stopword_hashes())]
+    with stage('dedup'):
+        _, first = np.unique(columns[:, 1], return_index=True)
+        return columns[np.sort(first), 1]
+
+def spacy_keywords_batch(texts, n_process=1, batch_size=32):
+    '''
+    This function runs the spacy keywords pipeline over many documents with nlp.pipe.
+    Documents found in the persistent analysis cache are not tagged again.
+    Input: List of text data, number of processes, documents per batch
+    Output: List of keywords lists, in input order
+    '''
+    return spacy_analysis_batch(texts, n_process, batch_size)[0]
+
+def spacy_analysis_batch(texts, n_process=1, batch_size=32, keyphrases=()):
+    '''
+    This function runs the spacy keywords pipeline over many documents with nlp.pipe, and detects
+    the keyphrases of the documents listed in keyphrases from the same Docs: every document is
+    tagged once. Results found in the persistent analysis cache are not computed again.
+    Input: List of text data, number of processes, documents per batch, indexes of the documents
+           whose keyphrases are needed
+    Output: List of keywords lists in input order, dict mapping document index to keyphrases
+    '''
+    cache = analysis_cache()
+    keyphrases = set(keyphrases)
+    keywords = [None] * len(texts)
+    phrases = {}
+    if cache is not None:
+        for i, text in enumerate(texts):
+            keywords[i] = cache.get('spacy_keywords', f"{spacy_keywords_version(text)}:{text_hash(text)}")
+            if i in keyphrases:
+                cached = cache.get('spacy_keyphrases', f"{spacy_keyphrases_version(text)}:{text_hash(text)}")
+                if cached is not None:
+                    phrases[i] = cached
+
+    misses = [i for i in range(len(texts)) if keywords[i] is None or (i in keyphrases and i not in phrases)]
+    if not misses:
+        return keywords, phrases
+    results = spacy_pipe_analysis([texts[i] for i in misses], n_process, batch_size,
+                                  keyphrases=[i in keyphrases for i in misses])
+    for i, (text_keywords, text_phrases) in zip(misses, results):
+        keywords[i] = text_keywords
+        if cache is not None:
+            cache.set('spacy_keywords', f"{spacy_keywords_version(texts[i])}:{text_hash(texts[i])}", text_keywords)
+        if text_phrases is not None:
+            phrases[i] = text_phrases
+            if cache is not None:
+                cache.set('spacy_keyphrases', f"{spacy_keyphrases_version(texts[i])}:{text_hash(texts[i])}",
+                          text_phrases)
+    return keywords, phrases
+
+def spacy_analysis(data):
+    '''
+    This function detects the keywords and the keyphrases of a text, e.g. a job description, from
+    one tagging. Results are served from the persistent analysis cache when it is enabled.
+    Input: Text data
+    Output: (keywords, keyphrases) tuple
+    '''
+    chunk_count = len(split_chunks(data))
+    n_process = analysis_processes(chunk_count) if chunk_count > 1 else 1
+    keywords, phrases = spacy_analysis_batch([data], n_process=n_process, batch_size=1, keyphrases=(0,))
+    return keywords[0], phrases[0]
+
+def spacy_pipe_analysis(texts, n_process=1, batch_size=32, max_chars=ANALYSIS_CHUNK_CHARS, keyphrases=None):
+    '''
+    This function tags many documents with nlp.pipe and detects their keywords, and their
+    keyphrases when asked. Documents longer than max_chars are split in chunks, whose results are
+    merged in text order.
+    Input: List of text data, number of processes, chunks per batch, maximum chunk size, one
+           flag per document telling if its keyphrases are needed (default: none)
+    Output: List of (keywords, keyphrases or None) tuples, in input order
+    '''
+    keyphrases = keyphrases or [False] * len(texts)
+    chunk_counts = []
+    def chunks():
+        # chunks are cleaned as the pipe asks for them; clean_text works character by character,
+        # so cleaning the chunks is the same as cleaning the text
+        for text in texts:
+            text_chunks = split_chunks(text, max_chars)
+            chunk_counts.append(len(text_chunks))
+            for chunk in text_chunks:
+                with stage('clean_text'):
+                    cleaned = clean_text(chunk)
+                yield cleaned
+
+    strings = load_spacy().vocab.strings
+    results = []
+    # every Doc is reduced to its keyword hashes (and keyphrases) as it comes out of the pipe,
+    # never all Docs at once
+    with stage('tagging', pipeline='spacy', documents=len(texts), processes=n_process):
+        docs = iter(load_spacy().pipe(chunks(), n_process=n_process, batch_size=batch_size))
+        for i in range(len(texts)):
+            hashes = []
+            text_phrases = []
+            # the pipe reads ahead, the chunk count of text i is known once its first Doc is out
+            first = next(docs)
+            for doc in chain([first], islice(docs, chunk_counts[i] - 1)):
+                hashes.append(spacy_doc_keyword_hashes(doc))
+                if keyphrases[i]:
+                    with stage('keyphrases'):
+                        text_phrases += spacy_doc_keyphrases(doc)
+            results.append(([strings[int(h)] for h in unique_hashes(hashes)],
+                            list(dict.fromkeys(text_phrases)) if keyphrases[i] else None))
+    return results
+
+def spacy_chunked_keywords(data, max_chars=ANALYSIS_CHUNK_CHARS, processes=None):
+    '''
+    This function runs the spacy pipeline on the chunks of a large text across a process pool,
+    with nlp.pipe, and merges their keywords in text order.
+    Input: Text data, maximum chunk size, number of processes (default: ANALYSIS_PROCESSES)
+    Output: Keywords
+    '''
+    chunk_count = len(split_chunks(data, max_chars))
+    processes = analysis_processes(chunk_count, processes)
+    return spacy_pipe_analysis([data], n_process=processes, batch_size=1, max_chars=max_chars)[0][0]
+
+def unique_hashes(arrays):
+    '''
+    This function merges keyword hash arrays, keeping the first occurrence of every hash.
+    Input: List of uint64 arrays
+    Output: uint64 array, in order of first occurrence
+    '''
+    hashes = np.concatenate(arrays) if arrays else np.zeros(0, dtype=np.uint64)
+    _, first = np.unique(hashes, return_index=True)
+    return hashes[np.sort(first)]
+
+# chunk boundaries, from the preferred to the last resort: blank lines between paragraphs,
+# whitespace after the end of a sentence, any whitespace
+CHUNK_BOUNDARIES = (r'(\n\s*\n)', r'(?<=[.!?])(\s+)', r'(\s+)')
+
+def split_chunks(text, max_chars=ANALYSIS_CHUNK_CHARS):
+    '''
+    This function splits a text into chunks of at most max_chars characters, at paragraph
+    boundaries when it can, else at sentence boundaries, else between words. Joined together,
+    the chunks give back the text.
+    Input: Text data, maximum chunk size
+    Output: List of chunks, in text order
+    '''
+    if len(text) <= max_chars:
+        return [text]
+    chunks = []
+    current = ''
+    for piece in _chunk_pieces(text, max_chars, 0):
+        if current and len(current) + len(piece) > max_chars:
+            chunks.append(current)
+            current = ''
+        current += piece
+    if current:
+        chunks.append(current)
+    return chunks
+
+def _chunk_pieces(text, max_chars, level):
+    if len(text) <= max_chars:
+        yield text
+    elif level == len(CHUNK_BOUNDARIES):
+        # a single word longer than a chunk
+        for start in range(0, len(text), max_chars):
+            yield text[start:start + max_chars]
+    else:
+        # the boundary is captured and kept at the end of the piece before it
+        parts = re.split(CHUNK_BOUNDARIES[level], text)
+        for i in range(0, len(parts), 2):
+            yield from _chunk_pieces(''.join(parts[i:i + 2]), max_chars, level + 1)
+
+def analysis_processes(chunks, processes=None):
+    '''
+    This function picks the number of processes tagging the chunks of a large text.
+    Input: Number of chunks, requested number of processes (default: ANALYSIS_PROCESSES, 0 is one per CPU)
+    Output: Number of processes, at least 1 and at most one per chunk
+    '''
+    processes = processes or ANALYSIS_PROCESSES or os.cpu_count() or 1
+    return max(1, min(processes, chunks))
+
+
+# multi word keyphrases are runs of adjectives and nouns ending with a noun; the parser is not
+# loaded, so they come from the part-of-speech tags instead of noun chunks
+KEYPHRASE_TAGS = ('JJ', 'NN', 'NNS', 'NNP', 'NNPS')
+KEYPHRASE_MAX_WORDS = 4
+# a noun run is kept as a keyphrase of a job description when the JD repeats it, or repeats every
+# one of its words: one-off runs of the legal and benefits boilerplate ("theft loss", "color
+# national") and tagging fragments are dropped
+KEYPHRASE_MIN_COUNT = 2
+
+def spacy_doc_keyphrases(tokens, max_words=KEYPHRASE_MAX_WORDS):
+    '''
+    This function detects multi word keyphrases ("machine learning", "google cloud platform") from
+    text already tokenised and tagged by spacy. A phrase starts and ends at whitespace, so it
+    matches the phrase_tokens of the text.
+    Input: spacy Doc, maximum number of words of a phrase
+    Output: Keyphrases, in order of first occurrence
+    '''
+    stop_words = load_spacy().Defaults.stop_words
+    phrases = []
+    run = []
+    for tok in list(tokens) + [None]:
+        if tok is not None and tok.tag_ in KEYPHRASE_TAGS and tok.lower_ not in stop_words and not tok.like_num:
+            run.append(tok)
+            continue
+        while run and run[-1].tag_ == 'JJ':
+            run.pop()
+        if 2 <= len(run) <= max_words and (run[0].i == 0 or run[0].nbor(-1).whitespace_) \
+                and (run[-1].whitespace_ or run[-1].i == len(run[-1].doc) - 1):
+            phrases.append(run[0].doc[run[0].i:run[-1].i + 1].text.lower())
+        run = []
+    return list(dict.fromkeys(phrases))
+
+def spacy_keyphrases_version(data):
+    return f"{spacy_keywords_version(data)};max_words={KEYPHRASE_MAX_WORDS}"
+
+def spacy_keyphrases(data):
+    '''
+    This function contains the spacy pipeline to detect multi word keyphrases from input text data.
+    Results are served from the persistent analysis cache when it is enabled.
+    Input: Text data
+    Output: Keyphrases
+    '''
+    return spacy_analysis(data)[1]
+
+@lru_cache(maxsize=None)
+def skills_matcher(path=SKILLS_FILE):
+    '''
+    This function compiles the skills list of SKILLS_FILE, or returns None when it is not set.
+    Output: PhraseMatcher or None
+    '''
+    if not path:
+        return None
+    lines = Path(path).expanduser().read_text(encoding='utf-8').splitlines()
+    return PhraseMatcher(line.strip() for line in lines if line.strip() and not line.lstrip().startswith('#'))
+
+def frequent_keyphrases(text, phrases, min_count=KEYPHRASE_MIN_COUNT):
+    '''
+    This function keeps the noun runs a text is about: the runs it repeats, and the runs whose
+    words it all repeats.
+    Input: Text data, its noun runs, minimum number of occurrences
+    Output: List of keyphrases, in the order of phrases
+    '''
+    tokens = phrase_tokens(text)
+    word_counts = Counter(tokens)
+    matcher = compiled_matcher(tuple(phrases))
+    phrase_counts = matcher.find(tokens)
+    return [phrase for phrase in matcher.phrases
+            if phrase_counts[phrase] >= min_count
+            or all(word_counts[word] >= min_count for word in phrase.split())]
+
+def jd_keyphrases(job_description, phrases=None):
+    '''
+    This function lists the keyphrases of a job description: its frequent noun runs and the skills
+    of the skills list it mentions.
+    Input: Job description text, its noun runs when it is already tagged (default: tagged here)
+    Output: Tuple of keyphrases
+    '''
+    if phrases is None:
+        phrases = spacy_keyphrases(job_description)
+    phrases = frequent_keyphrases(job_description, phrases)
+    skills = skills_matcher()
+    if skills is not None:
+        found = skills.find(job_description)
+        phrases = phrases + [phrase for phrase in skills.phrases if phrase in found]
+    return tuple(dict.fromkeys(phrases))
+
+
+def text_hash(text):
+    '''
+    This function computes a stable content hash of the input text, used as cache key.
+    Input: Text string
+    Output: Hex digest string
+    '''
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+def count_vector(text):
+    '''
+    This function counts the terms of the input text with the same analyzer CountVectorizer uses.
+    Results are served from the persistent analysis cache when it is enabled.
+    Input: Text string
+    Output: Counter mapping term to count
+    '''
+    import sklearn
+    return Counter(cached_analysis('count_vector', f"sklearn={sklearn.__version__}", text, _count_vector))
+
+def _count_vector(text):
+    from sklearn.feature_extraction.text import CountVectorizer
+    analyzer = CountVectorizer().build_analyzer()
+    return Counter(analyzer(text))
+
+def cosine_from_counts(counts_a, counts_b):
+    '''
+    This function computes the cosine similarity between two term count vectors.
+    It is equivalent to fitting a CountVectorizer on both texts and calling cosine_similarity.
+    Input: Two Counters mapping term to count
+    Output: Cosine similarity between 0 and 1
+    '''
+    if len(counts_a) > len(counts_b):
+        counts_a, counts_b = counts_b, counts_a
+    dot = sum(count * counts_b.get(term, 0) for term, count in counts_a.items())
+    norm_a = math.sqrt(sum(count * count for count in counts_a.values()))
+    norm_b = math.sqrt(sum(count * count for count in counts_b.values()))
+    if not norm_a or not norm_b:
+        return 0.0
+    return dot / (norm_a * norm_b)
+
+def match_keyword_hashes(keywords_jd, jd_hashes, resume_hashes):
+    '''
+    This function matches the job description keywords against the resume keywords on their hashes.
+    Input: JD keywords list, their hashes, resume keyword hashes
+    Output: Table rows [keyword, 'Match'/'No Match'] in JD order, list of matched keywords
+    '''
+    found = np.isin(jd_hashes, resume_hashes).tolist()
+    table = [[word, 'Match' if hit else 'No Match'] for word, hit in zip(keywords_jd, found)]
+    matched = [word for word, hit in zip(keywords_jd, found) if hit]
+    return table, matched
+
+
+
+class JobDescriptionProfile(NamedTuple):
+    '''
+    Everything _run needs from a job description: its keywords, their hashes, its term counts, the
+    compiled automaton of its keyphrases and their counts.
+    '''
+    keywords: List[str]
+    keyword_hashes: np.ndarray
+    counts: Counter
+    phrase_matcher: PhraseMatcher
+    phrase_counts: Counter
+
+
+def job_description_profile(job_description):
+    '''
+    This function builds the keyword profile of a job description.
+    Input: Job description text
+    Output: JobDescriptionProfile
+    '''
+    # keywords and keyphrases come from the same tagging of the job description
+    keywords, phrases = spacy_analysis(job_description)
+    phrase_matcher = compiled_matcher(jd_keyphrases(job_description, phrases))
+    return JobDescriptionProfile(keywords, keyword_hashes(keywords), count_vector(job_description),
+                                 phrase_matcher, phrase_matcher.find(job_description))
+
+
+def split_paragraphs(text):
+    '''
+    This function splits the input text into paragraphs at blank lines.
+    Input: Text string
+    Output: List of non empty paragraphs
+    '''
+    return [p for p in re.split(r'\n\s*\n', text) if p.strip()]
+
+
+class ParagraphKeywordCache:
+    '''
+    Incremental spacy keywords extraction for successive revisions of one document.
+    Paragraph keywords are cached by paragraph hash (LRU), and the keyword counts of the last
+    analyzed revision are updated with the paragraphs added and removed, so re-analyzing a
+    revision only tags the paragraphs that changed.
+    '''
+
+    def __init__(self, max_paragraphs=1024):
+        self.max_paragraphs = max_paragraphs
+        # paragraph hash -> keyword hashes, LRU ordered
+        self._paragraphs = OrderedDict()
+        # paragraph hash multiset of the last revision, with the keywords of each paragraph
+        self._revision = Counter()
+        self._revision_keywords = {}
+        # keyword hash -> number of paragraphs of the last revision containing it
+        self._keyword_counts = Counter()
+
+    def _tag(self, paragraphs):
+        # paragraph keywords are kept as hash arrays, 8 bytes per keyword
+        return [keyword_hashes(keywords) for keywords in spacy_keywords_batch(paragraphs)]
+
+    def _remember(self, key, keywords):
+        self._paragraphs[key] = keywords
+        self._paragraphs.move_to_end(key)
+        while len(self._paragraphs) > self.max_paragraphs:
+            self._paragraphs.popitem(last=False)
+
+    def _update_counts(self, keywords, delta):
+        for word in keywords.tolist():
+            count = self._keyword_counts[word] + delta
+            if count > 0:
+                self._keyword_counts[word] = count
+            else:
+                del self._keyword_counts[word]
+
+    def keyword_hashes(self, text):
+        '''
+        This function returns the spacy keywords of a document, tagging only new paragraphs.
+        Input: Text data
+        Output: uint64 array of keyword hashes
+        '''
+        paragraphs = {}
+        revision = Counter()
+        for paragraph in split_paragraphs(text):
+            key = text_hash(paragraph)
+            paragraphs.setdefault(key, paragraph)
+            revision[key] += 1
+
+        keywords = {}
+        unseen = []
+        for key in paragraphs:
+            if key in self._revision_keywords:
+                keywords[key] = self._revision_keywords[key]
+            elif key in self._paragraphs:
+                keywords[key] = self._paragraphs[key]
+                self._paragraphs.move_to_end(key)
+            else:
+                unseen.append(key)
+        for key, paragraph_keywords in zip(unseen, self._tag([paragraphs[k] for k in unseen])):
+            keywords[key] = paragraph_keywords
+            self._remember(key, paragraph_keywords)
+
+        for key, n in (self._revision - revision).items():
+            self._update_counts(self._revision_keywords[key], -n)
+        for key, n in (revision - self._revision).items():
+            self._update_counts(keywords[key], n)
+
+        self._revision = revision
+        self._revision_keywords = keywords
+        return np.fromiter(self._keyword_counts, dtype=np.uint64, count=len(self._keyword_counts))
+
+
+# missing key phrases listed under the table report, by weight in the JD
+TABLE_MISSING_PHRASES = 10
+
+def missing_by_weight(missing, weights, k=None):
+    # stable sort: phrases or keywords of equal weight stay in JD order
+    return sorted(missing, key=lambda item: weights[item], reverse=True)[:k]
+
+def table_report(analysis):
+    '''
+    This function renders an analysis as the psql table report listing every JD keyword, followed
+    by the TABLE_MISSING_PHRASES missing key phrases that weigh most in the JD.
+    Input: Analysis dict from KeywordsAnalyzerTool.analyze
+    Output: Report string
+    '''
+    from tabulate import tabulate
+    ret_val = "Comparing Resume and Job Description:"
+    ret_val += "\n" + tabulate(analysis['table'], headers=['ID', 'JD Keyword', 'JD-Resume Match Result'],
+                               showindex='always', tablefmt='psql')
+    ret_val += "\n" + f"Match percentage based on Keywords: {analysis['keywords_match']}%"
+    ret_val += "\n" + f"match percentage based on cosine similarity: {analysis['cosine_similarity']}%"
+    if analysis['jd_phrases']:
+        ret_val += "\n" + f"Match percentage based on key phrases: {analysis['phrases_match']}%"
+        missing_phrases = analysis['missing_phrases']
+        if missing_phrases:
+            listed = missing_by_weight(missing_phrases, analysis['missing_phrase_weights'], TABLE_MISSING_PHRASES)
+            more = f" (+{len(missing_phrases) - len(listed)} more)" if len(missing_phrases) > len(listed) else ""
+            ret_val += "\n" + f"Missing key phrases: {', '.join(listed)}{more}"
+    ret_val += "\n" + 'Try to include unmatched keywords in your Resume to improve the JD-Resume compatibility.'
+    return ret_val
+
+def compact_result(analysis, top_k=None):
+    '''
+    This function reduces an analysis to the scores and the missing keywords, for compact JSON output.
+    With top_k only the top_k missing key phrases and keywords with the highest weight (count in the
+    JD) are kept: the phrases take at most half of the budget, the keywords the rest.
+    Input: Analysis dict from KeywordsAnalyzerTool.analyze, optional number of missing phrases and keywords
+    Output: Dict with scores, keyword counts and missing keywords
+    '''
+    missing = analysis['missing_keywords']
+    missing_phrases = analysis['missing_phrases']
+    if top_k is not None:
+        missing_phrases = missing_by_weight(missing_phrases, analysis['missing_phrase_weights'], top_k // 2)
+        missing = missing_by_weight(missing, analysis['missing_weights'], top_k - len(missing_phrases))
+    return {
+        'keywords_match': analysis['keywords_match'],
+        'cosine_similarity': analysis['cosine_similarity'],
+        'phrases_match': analysis['phrases_match'],
+        'matched_keywords': len(analysis['matched_keywords']),
+        'jd_keywords': analysis['jd_keywords'],
+        'missing_total': len(analysis['missing_keywords']),
+        'missing_keywords': missing,
+        'matched_phrases': len(analysis['matched_phrases']),
+        'jd_phrases': analysis['jd_phrases'],
+        'missing_phrases': missing_phrases,
+    }
+
+
+# "table" lists every JD keyword with its match result, "json" only returns the scores and the
+# missing keywords: far fewer tokens when the result goes back into the agent context
+OUTPUT_FORMATS = ("table", "json")
 
 
 class KeywordsAnalyzeInput(BaseModel):
@@ -170,6 +882,17 @@ class KeywordsAnalyzeInput(BaseModel):
     job_description: str = Field(
         None, description="Job Description"
     )
+    output_format: str = Field(
+        "table", description="'table' lists every JD keyword with its match result, 'json' returns only "
+                             "the scores and the missing keywords (much shorter)"
+    )
+    top_k: Optional[int] = Field(
+        None, description="With output_format 'json', only return the top_k missing key phrases and keywords "
+                          "by weight in the JD"
+    )
+    include_timings: bool = Field(
+        False, description="Append the per-stage timings of the analysis as JSON"
+    )
 
 # based on https://github.com/sumitprdrsh/Resume_Compatibility
 class KeywordsAnalyzerTool(BaseTool):
@@ -177,54 +900,116 @@ class KeywordsAnalyzerTool(BaseTool):
     description: str = ("Performs keywords analysis comparing the job description and the resume to evaluate the "
                         "matching words. It returns a table with tree columns, ID, JD Keyword, JD-Resume Match "
                         "Result. Iyt also returns Match percentage based on Keywords and Match percentage based on "
-                        "Cosine Similarity")
+                        "Cosine Similarity. Set output_format to 'json' to get only the scores and the missing "
+                        "keywords (optionally the top_k by weight) as compact JSON.")
     args_schema: Type[KeywordsAnalyzeInput] = KeywordsAnalyzeInput
-
-    def _run(self, resume: str, job_description: str) -> str:
-
-        # keywords extraction from job description
-        keywords_jd = spacy_keywords(job_description)
+    # number of job description profiles kept in memory; the tailoring loop scores many
+    # resume drafts against the same job description, so it only needs to be analyzed once
+    jd_cache_size: int = 8
+
+    _jd_profiles: OrderedDict = PrivateAttr(default_factory=OrderedDict)
+    # resume drafts change a little between iterations, only changed paragraphs are re-tagged
+    _resume_keywords: ParagraphKeywordCache = PrivateAttr(default_factory=ParagraphKeywordCache)
+
+    def _jd_profile(self, job_description: str) -> JobDescriptionProfile:
+        key = text_hash(job_description)
+        profile = self._jd_profiles.get(key)
+        if profile is not None:
+            self._jd_profiles.move_to_end(key)
+            return profile
+
+        profile = job_description_profile(job_description)
+        self._jd_profiles[key] = profile
+        while len(self._jd_profiles) > self.jd_cache_size:
+            self._jd_profiles.popitem(last=False)
+        return profile
+
+    def _run(self, resume: str, job_description: str, output_format: str = "table", top_k: Optional[int] = None,
+             include_timings: bool = False) -> str:
+        if output_format not in OUTPUT_FORMATS:
+            raise ValueError(f"output_format must be one of {', '.join(OUTPUT_FORMATS)}, not `{output_format}`")
+
+        # every stage is timed and exported as a tracing span, see tools/instrumentation.py
+        timer = StageTimer()
+        with timer.activate(), stage('keywords_analyzer_tool', resume_chars=len(resume),
+                                     job_description_chars=len(job_description), output_format=output_format):
+            analysis = self.analyze(resume, job_description)
+            with stage('report'):
+                if output_format == "json":
+                    result = compact_result(analysis, top_k)
+                else:
+                    ret_val = table_report(analysis)
+
+        if output_format == "json":
+            if include_timings:
+                result["timings"] = timer.as_dict()
+            return json.dumps(result)
+        if include_timings:
+            ret_val += "\n" + "Timings: " + json.dumps(timer.as_dict())
+        return ret_val
+
+    def analyze(self, resume: str, job_description: str) -> dict:
+        '''
+        Scores the resume against the job description.
+        Returns the match table, the matched and missing JD keywords (in JD order), the weight of
+        each missing keyword (its count in the JD), the same for the JD keyphrases, and the
+        keywords, cosine similarity and keyphrases match percentages.
+        '''
+
+        # keywords extraction from job description, cached by content hash
+        with stage('jd_keywords'):
+            jd_profile = self._jd_profile(job_description)
+        keywords_jd = jd_profile.keywords
         # keywords_jd = nltk_keywords(job_description)
+        if not keywords_jd:
+            raise ValueError("the job description has no keywords to match")
 
 
         # keywords extraction from resume
         # keywords_resume = nltk_keywords(data_resume)
-        keywords_resume = spacy_keywords(resume)
+        with stage('resume_keywords'):
+            resume_hashes = self._resume_keywords.keyword_hashes(resume)
 
         # ----------------Matching Keywords between JD and Resume-----------------------
         # Creating a table showing Match Result between JD and Resume
-        jd_keywords_in_resume_table = []
-        for word in keywords_jd:
-            if word in keywords_resume:
-                match_result = [word, 'Match']
-            else:
-                match_result = [word, 'No Match']
-            jd_keywords_in_resume_table.append(match_result)
-
-        from tabulate import tabulate
-        ret_val = "Comparing Resume and Job Description:"
-        ret_val += "\n" + tabulate(jd_keywords_in_resume_table, headers=['ID', 'JD Keyword', 'JD-Resume Match Result'],
-                       showindex='always', tablefmt='psql')
+        with stage('matching'):
+            jd_keywords_in_resume_table, jd_keywords_in_resume_list = match_keyword_hashes(
+                keywords_jd, jd_profile.keyword_hashes, resume_hashes)
 
         # calculating the percentage of the match result
-        jd_keywords_in_resume_list = [w for w in keywords_jd if w in keywords_resume]
         jd_keywords_in_resume_list_count = len(jd_keywords_in_resume_list)
         jd_keywords_count_total = len(keywords_jd)
 
-        match_percentage = (jd_keywords_in_resume_list_count / jd_keywords_count_total) * 100
-        match_percentage = round(match_percentage, 2)  # round to two decimal
-        ret_val += "\n" + f"Match percentage based on Keywords: {match_percentage}%"
+        keywords_match = (jd_keywords_in_resume_list_count / jd_keywords_count_total) * 100
+        keywords_match = round(keywords_match, 2)  # round to two decimal
 
         # calculating the cosine similarity between JD and Resume Keywords----------------
-        text = [job_description, resume]
-        cv = CountVectorizer()
-        count_matrix = cv.fit_transform(text)
+        # the job description count vector comes from the cache, only the resume is counted
         # get the match percentage
-        match_percentage = cosine_similarity(count_matrix)[0][1] * 100
-        match_percentage = round(match_percentage, 2)  # round to two decimal
-        ret_val += "\n" + f"match percentage based on cosine similarity: {match_percentage}%"
-
-        ret_val += "\n" + 'Try to include unmatched keywords in your Resume to improve the JD-Resume compatibility.'
-
-        return  ret_val
-
+        with stage('cosine'):
+            cosine_match = cosine_from_counts(jd_profile.counts, count_vector(resume)) * 100
+        cosine_match = round(cosine_match, 2)  # round to two decimal
+
+        # multi word keyphrases: one linear scan of the resume with the automaton of the JD
+        with stage('phrases'):
+            phrases = jd_profile.phrase_matcher.phrases
+            resume_phrases = jd_profile.phrase_matcher.find(resume)
+            matched_phrases = [phrase for phrase in phrases if phrase in resume_phrases]
+            missing_phrases = [phrase for phrase in phrases if phrase not in resume_phrases]
+        phrases_match = round(len(matched_phrases) / len(phrases) * 100, 2) if phrases else 0.0
+
+        missing = [row[0] for row in jd_keywords_in_resume_table if row[1] == 'No Match']
+        return {
+            'table': jd_keywords_in_resume_table,
+            'matched_keywords': jd_keywords_in_resume_list,
+            'missing_keywords': missing,
+            'missing_weights': {word: jd_profile.counts.get(word, 0) for word in missing},
+            'jd_keywords': jd_keywords_count_total,
+            'keywords_match': keywords_match,
+            'cosine_similarity': cosine_match,
+            'matched_phrases': matched_phrases,
+            'missing_phrases': missing_phrases,
+            'missing_phrase_weights': {phrase: jd_profile.phrase_counts[phrase] for phrase in missing_phrases},
+            'jd_phrases': len(phrases),
+            'phrases_match': phrases_match,
+        }
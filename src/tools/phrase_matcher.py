@@ -0,0 +1,98 @@
+import re
+from collections import Counter, deque
+from functools import lru_cache
+from typing import Iterable, List, Tuple
+
+
+def phrase_tokens(text):
+    '''
+    This function splits text into the lower case word tokens phrases are matched on. It drops
+    the characters clean_text drops, so phrases taken from a cleaned text match the raw text.
+    Input: Text string
+    Output: List of tokens
+    '''
+    return re.sub(r'[^a-z0-9\s\/]', '', text.lower()).replace('/', ' ').split()
+
+
+class PhraseMatcher:
+    '''
+    Aho-Corasick automaton over word tokens. The phrases are compiled once; find() then scans a
+    text in one linear pass, whatever the number of phrases, and reports overlapping matches
+    ("google cloud" and "google cloud platform" both match "Google Cloud Platform").
+    '''
+
+    def __init__(self, phrases: Iterable[str]):
+        self.phrases: List[str] = []
+        # state -> {token: next state}, state -> failure state, state -> indexes of the phrases ending there
+        self._goto = [{}]
+        self._fail = [0]
+        self._out = [()]
+        seen = set()
+        for phrase in phrases:
+            tokens = phrase_tokens(phrase)
+            key = " ".join(tokens)
+            if tokens and key not in seen:
+                seen.add(key)
+                self._add(tokens, len(self.phrases))
+                self.phrases.append(key)
+        self._link()
+
+    def _add(self, tokens, index):
+        state = 0
+        for token in tokens:
+            next_state = self._goto[state].get(token)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto[state][token] = next_state
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append(())
+            state = next_state
+        self._out[state] += (index,)
+
+    def _link(self):
+        # breadth first: the failure state of a state is the longest proper suffix of its path
+        # that is also a path from the root, and a state outputs what its failure state outputs
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for token, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fail = self._fail[state]
+                while fail and token not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[next_state] = self._goto[fail].get(token, 0)
+                self._out[next_state] += self._out[self._fail[next_state]]
+
+    def __len__(self):
+        return len(self.phrases)
+
+    def find(self, text) -> Counter:
+        '''
+        This function counts the occurrences of every phrase in a text.
+        Input: Text string, or the list of its phrase_tokens
+        Output: Counter mapping phrase to number of occurrences
+        '''
+        tokens = phrase_tokens(text) if isinstance(text, str) else text
+        goto, fail, out = self._goto, self._fail, self._out
+        counts = Counter()
+        state = 0
+        for token in tokens:
+            while state and token not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(token, 0)
+            for index in out[state]:
+                counts[index] += 1
+        return Counter({self.phrases[index]: n for index, n in counts.items()})
+
+
+@lru_cache(maxsize=64)
+def compiled_matcher(phrases: Tuple[str, ...]) -> PhraseMatcher:
+    '''
+    This function returns the automaton of a tuple of phrases, compiled once per process: a job
+    description scored against many resumes, or against every draft of the tailoring loop,
+    reuses the same automaton.
+    Input: Tuple of phrases
+    Output: PhraseMatcher
+    '''
+    return PhraseMatcher(phrases)
@@ -0,0 +1,164 @@
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+import time
+from functools import lru_cache
+from typing import Any, Optional
+
+import requests
+from crewai_tools import SerperDevTool
+from crewai_tools.security.safe_requests import safe_get
+from crewai_tools.tools.scrape_website_tool.scrape_website_tool import ScrapeWebsiteTool
+
+from tools.disk_cache import DiskCache, disk_cache_from_env
+
+logger = logging.getLogger(__name__)
+
+# Opt-in on-disk cache of scraped pages and web search results, shared by both crews and by
+# every run on the machine, e.g. letters for several roles at the same company.
+#   WEB_CACHE_PATH    SQLite file of the cache; the cache is off when it is not set
+#   WEB_CACHE_TTL     seconds a page or search result is served without asking the network
+#                     (default 1 day); a stale page is revalidated with its ETag/Last-Modified
+#   WEB_CACHE_MAX_MB  size cap, least recently used entries are evicted first (default 256)
+DEFAULT_TTL = 24 * 3600
+# requests for the same key share a lock; keys are spread over a fixed number of locks
+LOCK_STRIPES = 64
+PAGES = "page"
+SEARCHES = "search"
+
+
+def request_key(*parts):
+    return hashlib.sha256(json.dumps(parts, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+class WebCache:
+    """
+    Pages and search results over a DiskCache. A page fresher than ttl is served from disk; a
+    stale one is fetched with If-None-Match/If-Modified-Since, and a 304 answer keeps the stored
+    copy for another ttl, and a failed refetch serves the stale copy. Concurrent requests for
+    the same key in a process share one fetch.
+    """
+
+    def __init__(self, disk: DiskCache, ttl: float = DEFAULT_TTL):
+        self.disk = disk
+        self.ttl = ttl
+        self._locks = [threading.RLock() for _ in range(LOCK_STRIPES)]
+
+    def _lock(self, namespace, key):
+        return self._locks[hash((namespace, key)) % LOCK_STRIPES]
+
+    def fetch(self, url: str, headers: Optional[dict] = None, cookies: Optional[dict] = None,
+              timeout: float = 15) -> str:
+        '''
+        This function returns the text of a web page, from the cache when it is fresh or unchanged.
+        Input: URL, request headers, cookies, timeout in seconds
+        Output: Page text
+        '''
+        key = request_key(url, cookies or {})
+        with self._lock(PAGES, key):
+            entry = self.disk.get(PAGES, key)
+            now = time.time()
+            if entry is not None and now - entry["fetched_at"] <= self.ttl:
+                logger.debug(f"Web cache hit: {url}")
+                return entry["text"]
+
+            request_headers = dict(headers or {})
+            if entry is not None:
+                if entry.get("etag"):
+                    request_headers["If-None-Match"] = entry["etag"]
+                if entry.get("last_modified"):
+                    request_headers["If-Modified-Since"] = entry["last_modified"]
+            try:
+                response = safe_get(url, timeout=timeout, headers=request_headers, cookies=cookies or {})
+            except requests.RequestException as e:
+                if entry is None:
+                    raise
+                logger.warning(f"⚠️ Refetching {url} failed ({e}), serving the cached copy")
+                return entry["text"]
+
+            if response.status_code == 304 and entry is not None:
+                logger.debug(f"Web cache revalidated: {url}")
+                entry["fetched_at"] = now
+                self.disk.set(PAGES, key, entry)
+                return entry["text"]
+            if not response.ok and entry is not None:
+                # the stale copy is kept as is, the next request tries the network again
+                logger.warning(f"⚠️ Refetching {url} failed (HTTP {response.status_code}), serving the cached copy")
+                return entry["text"]
+
+            response.encoding = response.apparent_encoding
+            text = response.text
+            if response.ok and "no-store" not in response.headers.get("Cache-Control", ""):
+                self.disk.set(PAGES, key, {
+                    "url": url,
+                    "text": text,
+                    "etag": response.headers.get("ETag"),
+                    "last_modified": response.headers.get("Last-Modified"),
+                    "fetched_at": now,
+                })
+            return text
+
+    def remember(self, namespace: str, key: str, compute) -> Any:
+        '''
+        This function serves a JSON serialisable result younger than ttl from the cache,
+        computing and storing it otherwise.
+        Input: Cache namespace, key, function computing the result
+        Output: Result
+        '''
+        with self._lock(namespace, key):
+            result = self.disk.get(namespace, key, ttl=self.ttl)
+            if result is None:
+                result = compute()
+                self.disk.set(namespace, key, result)
+            return result
+
+
+@lru_cache(maxsize=None)
+def web_cache() -> Optional[WebCache]:
+    '''
+    This function returns the web cache shared by the crews, or None when it is not enabled.
+    Output: WebCache or None
+    '''
+    disk = disk_cache_from_env("WEB_CACHE_PATH", "WEB_CACHE_MAX_MB")
+    if disk is None:
+        return None
+    return WebCache(disk, ttl=float(os.getenv("WEB_CACHE_TTL", DEFAULT_TTL)))
+
+
+class CachedScrapeWebsiteTool(ScrapeWebsiteTool):
+    """
+    ScrapeWebsiteTool reading pages through the web cache.
+    """
+
+    def _run(self, **kwargs: Any) -> Any:
+        cache = web_cache()
+        website_url = kwargs.get("website_url", self.website_url)
+        if cache is None or website_url is None:
+            return super()._run(**kwargs)
+
+        from bs4 import BeautifulSoup
+
+        html = cache.fetch(website_url, headers=self.headers, cookies=self.cookies)
+        # same text as ScrapeWebsiteTool
+        text = "The following text is scraped website content:\n\n"
+        text += BeautifulSoup(html, "html.parser").get_text(" ")
+        text = re.sub("[ \t]+", " ", text)
+        return re.sub("\\s+\n\\s+", "\n", text)
+
+
+class CachedSerperDevTool(SerperDevTool):
+    """
+    SerperDevTool keeping the search API responses in the web cache.
+    """
+
+    def _make_api_request(self, search_query: str, search_type: str) -> dict[str, Any]:
+        cache = web_cache()
+        if cache is None:
+            return super()._make_api_request(search_query, search_type)
+        key = request_key(self._get_search_url(search_type), search_query, self.n_results,
+                          self.country, self.location, self.locale)
+        return cache.remember(SEARCHES, key, lambda: super(CachedSerperDevTool, self)
+                              ._make_api_request(search_query, search_type))